@@ -2,37 +2,86 @@
 Authentication module for Fabric deployment.
 Supports both interactive and Azure CLI-based authentication.
 """
-import os
-from azure.identity import DefaultAzureCredential, InteractiveBrowserCredential, AzureCliCredential
+import time
+import threading
+from azure.identity import ChainedTokenCredential, InteractiveBrowserCredential, AzureCliCredential
+
+
+class CachingTokenCredential:
+    """
+    Wraps an Azure credential and caches tokens per scope.
+
+    AzureCliCredential spawns an 'az' subprocess on every get_token call,
+    which costs hundreds of ms. Cached tokens are reused until they are
+    within 30 seconds of expiry, so repeated API calls during a deployment
+    share a single token acquisition.
+    """
+
+    # Refresh tokens this many seconds before they expire
+    REFRESH_MARGIN_SECONDS = 30
+
+    def __init__(self, credential):
+        self._credential = credential
+        self._tokens = {}  # scope -> AccessToken
+        self._lock = threading.Lock()
+
+    def get_token(self, *scopes, **kwargs):
+        scope_key = scopes
+        with self._lock:
+            token = self._tokens.get(scope_key)
+            if token and token.expires_on - time.time() > self.REFRESH_MARGIN_SECONDS:
+                return token
+            token = self._credential.get_token(*scopes, **kwargs)
+            self._tokens[scope_key] = token
+            return token
+
+
+# Credential singleton shared across deploy invocations in one process,
+# so multi-environment drivers authenticate once instead of per deploy.
+# The lock keeps the prewarm thread and the deploy thread from racing
+# construction: a duplicate credential would discard the warmed token
+# and, on the browser fallback, could prompt for login twice.
+_credential = None
+_credential_lock = threading.Lock()
 
 
 def get_fabric_credential(use_cli=False):
     """
     Get Azure credential for Fabric authentication.
-    
+
+    Uses a credential chain that tries Azure CLI first (succeeds
+    immediately in CI or when 'az login' has been run) and falls back to
+    interactive browser login, so one code path covers both CI and local
+    use. The credential is created once per process and reused on
+    subsequent calls, so driver scripts deploying multiple environments
+    share a single authentication (and its token cache).
+
     Args:
-        use_cli: If True, use Azure CLI authentication (for CI/CD).
-                 If False, use interactive browser authentication (for local).
-    
+        use_cli: Retained for backwards compatibility; the chain already
+                 prefers CLI authentication when available.
+
     Returns:
-        Azure credential object
+        Azure credential object (wrapped in a token cache)
     """
-    if use_cli or os.getenv("GITHUB_ACTIONS") == "true":
-        print("Using Azure CLI authentication...")
-        return AzureCliCredential()
-    else:
-        print("Using interactive browser authentication...")
-        return InteractiveBrowserCredential()
+    global _credential
+    if _credential is None:
+        with _credential_lock:
+            if _credential is None:
+                print("Using Azure CLI authentication with browser fallback...")
+                _credential = CachingTokenCredential(
+                    ChainedTokenCredential(AzureCliCredential(), InteractiveBrowserCredential())
+                )
+    return _credential
 
 
 def get_token(credential, scope="https://api.fabric.microsoft.com/.default"):
     """
     Get access token for Fabric API.
-    
+
     Args:
         credential: Azure credential object
         scope: Authentication scope
-    
+
     Returns:
         Access token string
     """
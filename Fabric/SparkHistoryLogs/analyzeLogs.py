@@ -2,13 +2,143 @@ import re
 import sys
 import json
 import os
+import mmap
+import fnmatch
+from bisect import bisect_right
+from dataclasses import dataclass, asdict
 from datetime import datetime
 from typing import List, Dict, Optional
 import argparse
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from urllib.parse import urlparse
 from console_utils import *
 
+# Optional: Hyperscan scans all patterns in one pass over the raw bytes at
+# multi-GB/s. Falls back to the pure-Python union regex scan when missing.
+try:
+    import hyperscan
+except ImportError:
+    hyperscan = None
+
+# Optional: NumPy finds every newline in a buffer with one vectorized
+# comparison instead of a Python-level find loop.
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Optional: google-re2 matches in guaranteed linear time (no catastrophic
+# backtracking on adversarial lines) and compiles large alternations to a
+# C++ DFA/NFA hybrid, which is exactly the shape of the scan unions below.
+try:
+    import re2
+except ImportError:
+    re2 = None
+
+
+def _compile_regex(pattern, flags=0):
+    """Compile with re2 when available, falling back to stdlib re per pattern"""
+    if re2 is not None:
+        try:
+            return re2.compile(pattern, flags)
+        except Exception:
+            pass  # Pattern uses a construct re2 rejects
+    return re.compile(pattern, flags)
+
+# Optional: orjson decodes the consolidated file and serializes each
+# record 3-5x faster than stdlib json. Loads and exports both go through
+# these helpers so the two backends stay interchangeable.
+try:
+    import orjson
+
+    def _json_dumps(obj) -> str:
+        return orjson.dumps(obj).decode()  # serializes dataclasses natively
+
+    _json_loads = orjson.loads
+except ImportError:
+    def _json_dumps(obj) -> str:
+        return json.dumps(obj, default=asdict)
+
+    _json_loads = json.loads
+
+# Optional: zstd decompresses .zst log files written by livyconn's
+# streaming downloader; plain files scan exactly as before.
+try:
+    import zstandard as zstd
+except ImportError:
+    zstd = None
+
+# Optional: ijson iterates huge consolidated files one session at a time
+# instead of materializing the whole document, capping peak memory at one
+# session record. The yajl2_c backend is preferred when compiled in.
+try:
+    from ijson.backends import yajl2_c as ijson
+except ImportError:
+    try:
+        import ijson
+    except ImportError:
+        ijson = None
+
+
+# Hot-path match records. A dict costs ~230 bytes plus key storage per
+# match; these slotted records are a fraction of that and keep field
+# access a fixed-offset load. They materialize as dicts only at JSON
+# export time.
+@dataclass(slots=True)
+class ConnectionHit:
+    line_number: int
+    host: str
+    port: Optional[str]
+    raw_line: str
+    pattern_matched: str
+    count: int = 1
+
+
+@dataclass(slots=True)
+class PipInstallHit:
+    line_number: int
+    package: str
+    raw_line: str
+    pattern_matched: str
+
+
+@dataclass(slots=True)
+class LoggingConfigHit:
+    line_number: int
+    raw_line: str
+    pattern_matched: str
+
+
+class _TrustedTrie:
+    """
+    Reversed-label trie over trusted domains.
+
+    Each domain is inserted label-by-label from the right
+    ('api.fabric.microsoft.com' walks com -> microsoft -> fabric -> api)
+    with a terminal marking "this suffix and everything below it is
+    trusted". A host lookup walks its own labels the same way and stops at
+    the first terminal, so matching costs O(host labels) regardless of how
+    many domains are configured.
+    """
+
+    def __init__(self, domains):
+        self._root = {}
+        for domain in domains:
+            node = self._root
+            for label in reversed(domain.split('.')):
+                node = node.setdefault(label, {})
+            node[None] = True  # terminal: trusted at this suffix and below
+
+    def match(self, host: str) -> bool:
+        node = self._root
+        for label in reversed(host.split('.')):
+            node = node.get(label)
+            if node is None:
+                return False
+            if None in node:
+                return True
+        return False
+
 
 class SparkLogAnalyzer:
     """Analyzes Spark driver logs for external connection calls, pip installs, and logging status"""
@@ -76,20 +206,190 @@ class SparkLogAnalyzer:
         r'spark\.sql\.adaptive\.logLevel',
         r'spark\.log\.level',
     ]
+
+    # Literal substrings, at least one of which appears (lowercased) in any
+    # text our patterns can match. Checking these with bytes.__contains__ is
+    # a C-level memchr scan, ~10x cheaper than the regex walk, so blocks
+    # with no literal hit skip the regex entirely.
+    PREFILTER_LITERALS = (
+        b'://',                # every URL-scheme connection pattern
+        b'connect',            # connecting to / established connection to
+        b'remote address',
+        b'destination',
+        b'target',
+        b'kafka',
+        b'.core.windows.net',  # Azure storage endpoints
+        b'pip',                # pip install variants
+        b'install',            # Installing collected / Successfully installed
+        b'log4j',
+        b'logging.',
+        b'rootlogger',
+        b'logger.level',
+        b'loglevel',
+        b'spark.log.level',
+    )
+
+    # Block size for the prefiltered buffer scan
+    _SCAN_BLOCK_SIZE = 1 << 20
+
+    # Consolidated files above this size are streamed with ijson (when
+    # installed) rather than parsed in one piece
+    _STREAM_THRESHOLD_BYTES = 256 * 1024 * 1024
+
+    # Match categories in the fused scan union
+    CAT_CONNECTION = 0
+    CAT_PIP = 1
+    CAT_LOGGING = 2
+
+    # Compiled once at class level; is_trusted_host runs per connection
+    # match, so per-call re.compile would be pure repeated work
+    _UUID_RE = re.compile(r'^[a-f0-9]{8}-[a-f0-9]{4}-[a-f0-9]{4}-[a-f0-9]{4}-[a-f0-9]{12}$')
+    _SPARK_HOST_RE = re.compile(r'^spark\d+triprodeus$')
+    _FABRIC_TEMP_RE = re.compile(r'^[a-z0-9]{20,22}$')
+    _ABFS_UUID_RE = re.compile(
+        r'abfss?://([a-f0-9]{8}-[a-f0-9]{4}-[a-f0-9]{4}-[a-f0-9]{4}-[a-f0-9]{12})'
+        r'@[a-zA-Z0-9]+\.dfs\.core\.windows\.net', re.IGNORECASE)
     
-    def __init__(self, consolidated_file_path: str = None, trusted_domains: List[str] = None):
+    def __init__(self, consolidated_file_path: str = None, trusted_domains: List[str] = None,
+                 dedup_connections: bool = True):
         self.consolidated_file_path = consolidated_file_path
         self.session_results = []  # Results for each session
-        self.trusted_domains = trusted_domains or self.DEFAULT_TRUSTED_DOMAINS.copy()
-        self.compiled_connection_patterns = [re.compile(pattern, re.IGNORECASE) 
-                                           for pattern in self.CONNECTION_PATTERNS]
-        self.compiled_pip_patterns = [re.compile(pattern, re.IGNORECASE) 
-                                    for pattern in self.PIP_PATTERNS]
-        self.compiled_logging_patterns = [re.compile(pattern, re.IGNORECASE) 
-                                        for pattern in self.LOGGING_PATTERNS]
-    
+        self._agg = None  # Cached summary views over session_results
+        # Stored as a set: duplicates from repeated --add-trusted-domain
+        # collapse, and membership probes are O(1). Display paths use the
+        # sorted property view.
+        self._trusted_set = set(trusted_domains or self.DEFAULT_TRUSTED_DOMAINS)
+        self._trusted_sorted = None
+        # Collapse repeated (host, port, pattern) connection records into one
+        # record with a count, so memory stays O(unique endpoints) on logs
+        # that emit the same connection line hundreds of thousands of times
+        self.dedup_connections = dedup_connections
+        # Patterns compile once here, tagged with the category that routes
+        # their matches to the right result list; the byte-mode union per
+        # profile prefilters candidate lines
+        all_patterns = self.CONNECTION_PATTERNS + self.PIP_PATTERNS + self.LOGGING_PATTERNS
+        categories = ([self.CAT_CONNECTION] * len(self.CONNECTION_PATTERNS)
+                      + [self.CAT_PIP] * len(self.PIP_PATTERNS)
+                      + [self.CAT_LOGGING] * len(self.LOGGING_PATTERNS))
+        full_profile = self._build_scan_profile(all_patterns, categories)
+        # Specialized profiles per log file type: pip installs only surface
+        # in stdout and log4j configuration in livy/stderr, so typed files
+        # scan a smaller pattern set than the full superset
+        driver_profile = self._build_scan_profile(
+            self.CONNECTION_PATTERNS + self.LOGGING_PATTERNS,
+            [self.CAT_CONNECTION] * len(self.CONNECTION_PATTERNS)
+            + [self.CAT_LOGGING] * len(self.LOGGING_PATTERNS))
+        stdout_profile = self._build_scan_profile(
+            self.CONNECTION_PATTERNS + self.PIP_PATTERNS,
+            [self.CAT_CONNECTION] * len(self.CONNECTION_PATTERNS)
+            + [self.CAT_PIP] * len(self.PIP_PATTERNS))
+        self._scan_profiles = {
+            None: full_profile,
+            'livy': driver_profile,
+            'stderr': driver_profile,
+            'stdout': stdout_profile,
+        }
+        # Hyperscan database over all patterns, used as a candidate-line
+        # prefilter when the module is installed
+        self._hs_db = self._build_hyperscan_db() if hyperscan else None
+        self._rebuild_trust_structures()
+
+    @property
+    def trusted_domains(self) -> List[str]:
+        """Sorted view of the configured trusted domains/patterns (cached)"""
+        if self._trusted_sorted is None:
+            self._trusted_sorted = sorted(self._trusted_set)
+        return self._trusted_sorted
+
+    def add_trusted_domains(self, domains: List[str]):
+        """Add trusted domains/patterns and refresh the lookup structures"""
+        self._trusted_set.update(domains)
+        self._trusted_sorted = None
+        self._rebuild_trust_structures()
+
+    def _rebuild_trust_structures(self):
+        """
+        Build O(1)-lookup structures from the trusted-domains list.
+
+        Exact and suffix matches use a frozenset probed once per host
+        label, replacing the per-host linear scan over every trusted
+        entry. Rebuilt automatically if trusted_domains is extended after
+        construction (e.g. via --add-trusted-domain).
+        """
+        lowered = [domain.lower() for domain in self._trusted_set]
+        plain = [d for d in lowered if '*' not in d and '?' not in d]
+        wild = [d for d in lowered if '*' in d or '?' in d]
+        self._trusted_exact = frozenset(d for d in plain if not d.endswith('-'))
+        self._trusted_prefixes = tuple(d for d in plain if d.endswith('-'))
+        # Wildcard entries (added via --add-trusted-domain) fuse into one
+        # alternation so each host pays a single regex walk, not one match
+        # per pattern
+        self._trusted_wild_re = _compile_regex(
+            "|".join(fnmatch.translate(p) for p in wild)) if wild else None
+        self._trusted_count = len(self._trusted_set)
+        # Memo of per-host trust decisions: the same endpoints repeat on
+        # thousands of log lines, so lookups after the first are one dict
+        # hit. Seeded with the trusted list itself for instant exact hits.
+        self._trust_cache = {domain: True for domain in self._trusted_exact}
+        # Reversed-label trie: exact and suffix whitelist hits resolve in
+        # O(host labels) dict walks no matter how many domains are
+        # configured, where the previous generated ==/endswith chain still
+        # grew with the whitelist size
+        self._trusted_trie = _TrustedTrie(self._trusted_exact)
+
+    def _build_hyperscan_db(self):
+        """
+        Compile every pattern into one Hyperscan block-mode database.
+
+        Hyperscan walks the input bytes once for all patterns
+        simultaneously; matched lines are then re-scanned with the union
+        regexes to extract captures (Hyperscan reports offsets only).
+        Returns None when any pattern is unsupported.
+        """
+        patterns = self.CONNECTION_PATTERNS + self.PIP_PATTERNS + self.LOGGING_PATTERNS
+        try:
+            db = hyperscan.Database(mode=hyperscan.HS_MODE_BLOCK)
+            db.compile(
+                expressions=[p.encode() for p in patterns],
+                ids=list(range(len(patterns))),
+                flags=[hyperscan.HS_FLAG_CASELESS | hyperscan.HS_FLAG_PREFILTER] * len(patterns)
+            )
+            return db
+        except Exception:
+            return None  # Unsupported pattern; use the pure-Python scan
+
+    @classmethod
+    def _build_scan_profile(cls, patterns: List[str], categories: List[int]):
+        """
+        Build the scan state for one pattern subset: the individually
+        compiled, category-tagged patterns used for match extraction,
+        plus the byte-mode union used for candidate-line discovery.
+
+        Extraction deliberately stays one compiled regex per pattern. A
+        fused alternation only yields non-overlapping matches, so a line
+        where two patterns overlap (e.g. a full URL capture and a
+        storage-account suffix inside that URL) would record only the
+        first and silently drop the other finding.
+        """
+        compiled = [(_compile_regex(pattern, re.IGNORECASE), pattern, category)
+                    for pattern, category in zip(patterns, categories)]
+        union_bytes = _compile_regex(
+            b"|".join(b"(?:%s)" % p.encode() for p in patterns), re.IGNORECASE)
+        return compiled, union_bytes
+
     def is_trusted_host(self, host: str) -> bool:
-        """Check if a host is in the trusted domains list"""
+        """Check if a host is in the trusted domains list (memoized)"""
+        # Pick up domains added after construction (--add-trusted-domain)
+        if self._trusted_count != len(self._trusted_set):
+            self._rebuild_trust_structures()
+
+        cached = self._trust_cache.get(host)
+        if cached is None:
+            cached = self._trust_cache[host] = self._check_trusted_host(host)
+        return cached
+
+    def _check_trusted_host(self, host: str) -> bool:
+        """Uncached trust decision for a single host"""
         # Clean and extract actual hostname from the input
         actual_host = self._extract_hostname(host)
         
@@ -97,27 +397,29 @@ class SparkLogAnalyzer:
             return False
         
         host_lower = actual_host.lower()
-        
+
+        # Whitelist hit: the trie covers exact and label-boundary suffix
+        # matches, the tuple covers vm- style prefixes
+        if self._trusted_trie.match(host_lower) or host_lower.startswith(self._trusted_prefixes):
+            return True
+
+        # Wildcard whitelist entries, if any, share one compiled alternation
+        if self._trusted_wild_re is not None and self._trusted_wild_re.match(host_lower):
+            return True
+
         # Special check for workspace-based temp storage patterns
         # This handles ABFS URLs like abfss://workspace-id@hostname.dfs.core.windows.net
-        import re
-        uuid_pattern = r'^[a-f0-9]{8}-[a-f0-9]{4}-[a-f0-9]{4}-[a-f0-9]{4}-[a-f0-9]{12}$'
-        
         if '.dfs.core.windows.net' in host_lower and '@' in host_lower:
             container_part = host_lower.split('@')[0]
-            hostname_part = host_lower.split('@')[-1]
-            
+
             # Clean the container part of protocol prefixes
             clean_container = container_part.replace('abfss://', '').replace('abfs://', '')
-            
+
             # Check if container is exactly a workspace ID pattern (UUID format: 8-4-4-4-12 characters)
-            if re.match(uuid_pattern, clean_container):
+            if self._UUID_RE.match(clean_container):
                 # This looks like a workspace-based temp storage, treat as trusted
                 return True
-                
-        # Import regex at the top level to avoid repeated imports
-        import re
-                
+
         # Special pattern matching for Fabric and Azure storage identifiers
         # Handle both full hostnames and base hostnames (since CONNECTION_PATTERNS may extract just the base)
         hostname_base = host_lower
@@ -125,70 +427,58 @@ class SparkLogAnalyzer:
             hostname_base = host_lower.replace('.dfs.core.windows.net', '')
         
         # Pattern 1: spark*triprodeus hosts (like spark2triprodeus)
-        if re.match(r'^spark\d+triprodeus$', hostname_base):
+        if self._SPARK_HOST_RE.match(hostname_base):
             return True
-            
+
         # Pattern 2: Fabric temp storage identifiers (like olsblayjtsk9m43e910te)
         # These are typically random-looking 20-22 character alphanumeric strings
         # More restrictive pattern to avoid catching legitimate external storage accounts
-        if len(hostname_base) >= 20 and re.match(r'^[a-z0-9]{20,22}$', hostname_base):
+        if len(hostname_base) >= 20 and self._FABRIC_TEMP_RE.match(hostname_base):
             # Additional check: should not contain obvious words (like "dev", "prod", "test", "msft")
             common_words = ['dev', 'prod', 'test', 'msft', 'east', 'west', 'central', 'stage', 'stag']
             if not any(word in hostname_base for word in common_words):
                 return True
         
-        for trusted_domain in self.trusted_domains:
-            trusted_lower = trusted_domain.lower()
-            
-            # Exact match
-            if host_lower == trusted_lower:
-                return True
-                
-            # Domain suffix match (e.g., api.fabric.microsoft.com matches fabric.microsoft.com)
-            if host_lower.endswith('.' + trusted_lower) or host_lower.endswith(trusted_lower):
-                return True
-                
-            # Pattern match for VM hostnames (starts with vm-)
-            if trusted_lower.endswith('-') and host_lower.startswith(trusted_lower):
-                return True
-        
+        # Not in the whitelist and no special pattern matched
         return False
     
     def _extract_hostname(self, host_input: str) -> str:
         """Extract the actual hostname from various input formats"""
         if not host_input:
             return ""
-        
+
         # Remove leading/trailing whitespace and common punctuation
-        host_input = host_input.strip(' ,()"\'')
-        
-        # If it looks like a URL, parse it
-        if '://' in host_input:
-            try:
-                parsed = urlparse(host_input)
-                return parsed.hostname or parsed.netloc.split(':')[0]
-            except:
-                # Fallback to manual extraction
-                pass
-        
-        # Handle cases like "host.domain.com/path" without protocol
-        if '/' in host_input:
-            host_input = host_input.split('/')[0]
-        
+        host = host_input.strip(' ,()"\'')
+
+        # Cut a scheme:// prefix and any userinfo@ in front of the host;
+        # the inputs here are regex captures, not arbitrary URLs, so a few
+        # str.find cuts replace the full urlparse state machine and its
+        # ParseResult allocation on this per-match path
+        i = host.find('://')
+        if i != -1:
+            host = host[i + 3:]
+            i = host.find('@')
+            if i != -1:
+                host = host[i + 1:]
+
+        # Handle cases like "host.domain.com/path"
+        i = host.find('/')
+        if i != -1:
+            host = host[:i]
+
         # Handle cases like "host.domain.com?param=value"
-        if '?' in host_input:
-            host_input = host_input.split('?')[0]
-        
+        i = host.find('?')
+        if i != -1:
+            host = host[:i]
+
         # Handle cases like "host.domain.com:port"
-        if ':' in host_input and not host_input.count(':') > 1:  # Avoid IPv6
-            host_input = host_input.split(':')[0]
-        
+        if host.count(':') == 1:  # Avoid IPv6
+            host = host[:host.find(':')]
+
         # Final cleanup - remove trailing dots and common punctuation
-        host_input = host_input.strip(' ,()"\'.')
-        
-        return host_input
+        return host.strip(' ,()"\'.')
     
-    def analyze_single_log_file(self, log_file_path: str) -> Dict:
+    def analyze_single_log_file(self, log_file_path: str, log_type: str = None) -> Dict:
         """Analyze a single log file for connections, pip installs, and logging config"""
         result = {
             'log_file': log_file_path,
@@ -206,289 +496,455 @@ class SparkLogAnalyzer:
             
         try:
             result['file_size'] = os.path.getsize(log_file_path)
-            
-            with open(log_file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                for line_number, line in enumerate(f, 1):
-                    # Check for connections
-                    for pattern in self.compiled_connection_patterns:
-                        match = pattern.search(line)
-                        if match:
-                            connection_info = {
-                                'line_number': line_number,
-                                'host': match.group(1),
-                                'port': match.group(2) if len(match.groups()) > 1 else None,
-                                'raw_line': line.strip(),
-                                'pattern_matched': pattern.pattern
-                            }
-                            
-                            # Add to all connections
-                            result['connections'].append(connection_info)
-                            
-                            # Special check for workspace-based ABFS URLs before normal trusted host check
-                            is_trusted = False
-                            raw_line_lower = line.lower()
-                            
-                            # Check for ABFS URLs with workspace UUID containers
-                            if 'abfs' in raw_line_lower and '@' in raw_line_lower and '.dfs.core.windows.net' in raw_line_lower:
-                                import re
-                                # Look for ABFS URLs in the format abfss://uuid@hostname.dfs.core.windows.net
-                                abfs_pattern = r'abfss?://([a-f0-9]{8}-[a-f0-9]{4}-[a-f0-9]{4}-[a-f0-9]{4}-[a-f0-9]{12})@[a-zA-Z0-9]+\.dfs\.core\.windows\.net'
-                                if re.search(abfs_pattern, raw_line_lower):
-                                    is_trusted = True
-                            
-                            # If not already marked as trusted, check normal trusted host patterns
-                            if not is_trusted:
-                                is_trusted = self.is_trusted_host(connection_info['host'])
-                            
-                            # Categorize as trusted or external
-                            if is_trusted:
-                                result['trusted_connections'].append(connection_info)
-                            else:
-                                result['external_connections'].append(connection_info)
-                    
-                    # Check for pip installs
-                    for pattern in self.compiled_pip_patterns:
-                        match = pattern.search(line)
-                        if match:
-                            pip_info = {
-                                'line_number': line_number,
-                                'package': match.group(1),
-                                'raw_line': line.strip(),
-                                'pattern_matched': pattern.pattern
-                            }
-                            result['pip_installs'].append(pip_info)
-                    
-                    # Check for logging configuration
-                    for pattern in self.compiled_logging_patterns:
-                        match = pattern.search(line)
-                        if match:
-                            logging_info = {
-                                'line_number': line_number,
-                                'raw_line': line.strip(),
-                                'pattern_matched': pattern.pattern
-                            }
-                            result['logging_config'].append(logging_info)
-        
+
+            # A compressed log without the codec must fail loudly: the
+            # mmap fallback would scan the compressed bytes, match
+            # nothing, and report the file as clean
+            if log_file_path.endswith('.zst') and zstd is None:
+                result['error'] = ("zstandard is not installed; cannot read "
+                                   "compressed log file")
+                return result
+
+            with open(log_file_path, 'rb') as f:
+                if log_file_path.endswith('.zst'):
+                    # Logs stored compressed by the downloader; the scan
+                    # runs over the decompressed bytes
+                    with zstd.ZstdDecompressor().stream_reader(f) as reader:
+                        buf = reader.read()
+                else:
+                    try:
+                        buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                    except (ValueError, OSError):
+                        # Empty files cannot be mapped, and some filesystems
+                        # refuse mmap entirely; fall back to reading the raw
+                        # bytes in large blocks. Either way the scan stays in
+                        # byte mode - no text-mode decoding of unmatched data.
+                        buf = b''.join(iter(lambda: f.read(1 << 22), b''))
+                self._scan_buffer(buf, result, self._scan_profiles.get(log_type))
+
         except Exception as e:
             result['error'] = str(e)
-            
+
         return result
+
+    @staticmethod
+    def _newline_offsets(buf) -> List[int]:
+        """Index of every newline byte, for offset -> line number mapping"""
+        if np is not None and len(buf):
+            # One C-level pass over the buffer; .tolist() keeps the result
+            # a plain list so the bisect lookups downstream are unchanged
+            return np.flatnonzero(np.frombuffer(buf, dtype=np.uint8) == 10).tolist()
+        offsets = []
+        pos = buf.find(b'\n')
+        while pos != -1:
+            offsets.append(pos)
+            pos = buf.find(b'\n', pos + 1)
+        return offsets
+
+    def _scan_buffer(self, buf, result: Dict, profile=None):
+        """
+        Scan a whole (memory-mapped) file buffer for candidate lines.
+
+        The byte-mode union regex (or Hyperscan, when installed) walks the
+        buffer once without any per-line Python loop or UTF-8 decoding;
+        only lines containing a candidate match are decoded and re-scanned
+        with the individual capture-aware patterns.
+        """
+        if profile is None:
+            profile = self._scan_profiles[None]
+        _, union_bytes = profile
+
+        nl_offsets = self._newline_offsets(buf)
+        candidate_lines = set()
+
+        # The Hyperscan database covers the full pattern superset even for
+        # typed files; the precise per-line re-scan below filters with the
+        # specialized union, so extra candidates are harmless
+        if self._hs_db is not None:
+            def on_match(pattern_id, start, end, flags, context=None):
+                candidate_lines.add(bisect_right(nl_offsets, end - 1))
+            self._hs_db.scan(buf, match_event_handler=on_match)
+        else:
+            # Walk the buffer in line-aligned blocks; a cheap lowercased
+            # literal scan rejects blocks with nothing to match before the
+            # (much costlier) union regex runs
+            size = len(buf)
+            start = 0
+            while start < size:
+                end = min(start + self._SCAN_BLOCK_SIZE, size)
+                if end < size:
+                    nl = buf.find(b'\n', end)
+                    end = size if nl == -1 else nl + 1
+                block_lower = bytes(buf[start:end]).lower()
+                if any(lit in block_lower for lit in self.PREFILTER_LITERALS):
+                    for match in union_bytes.finditer(buf, start, end):
+                        candidate_lines.add(bisect_right(nl_offsets, match.start()))
+                start = end
+
+        seen_conn = {} if self.dedup_connections else None
+        for line_idx in sorted(candidate_lines):
+            line_start = nl_offsets[line_idx - 1] + 1 if line_idx > 0 else 0
+            line_end = nl_offsets[line_idx] if line_idx < len(nl_offsets) else len(buf)
+            line = bytes(buf[line_start:line_end]).decode('utf-8', 'ignore')
+            self._scan_line(line, line_idx + 1, result, seen_conn, profile)
+
+    def _scan_line(self, line: str, line_number: int, result: Dict,
+                   seen_conn: Optional[Dict] = None, profile=None):
+        """Run each compiled pattern against one candidate line and record matches"""
+        if profile is None:
+            profile = self._scan_profiles[None]
+        compiled, _ = profile
+
+        # Strip once per line; every record on this line shares the same
+        # string object instead of re-stripping per match
+        raw_line = line.strip()
+
+        # One pass per pattern, as the file-level scan did originally:
+        # patterns match independently, so overlapping hits from different
+        # patterns on the same line are all recorded. The byte-mode union
+        # already filtered out the lines with nothing to match, so these
+        # passes run over candidate lines only.
+        for regex, pattern, category in compiled:
+            for match in regex.finditer(line):
+                if category == self.CAT_CONNECTION:
+                    host = match.group(1)
+                    port = match.group(2) if regex.groups > 1 else None
+                    # Lowercase only the short captured host - never the
+                    # full line - and reuse it for both the dedup key and
+                    # the trust check
+                    host_lower = host.lower()
+
+                    # Repeated endpoints just bump the count on the record
+                    # from their first occurrence instead of appending a
+                    # new dict
+                    if seen_conn is not None:
+                        key = (host_lower, port, pattern)
+                        previous = seen_conn.get(key)
+                        if previous is not None:
+                            previous.count += 1
+                            continue
+
+                    connection_info = ConnectionHit(line_number, host, port, raw_line, pattern)
+                    if seen_conn is not None:
+                        seen_conn[key] = connection_info
+
+                    # Add to all connections
+                    result['connections'].append(connection_info)
+
+                    # Special check for workspace-based ABFS URLs
+                    # (format: abfss://uuid@hostname.dfs.core.windows.net);
+                    # the compiled pattern is case-insensitive, so no
+                    # lowered copy of the line is needed
+                    is_trusted = self._ABFS_UUID_RE.search(line) is not None
+
+                    # If not already marked as trusted, check normal trusted host patterns
+                    if not is_trusted:
+                        is_trusted = self.is_trusted_host(host_lower)
+
+                    # Categorize as trusted or external
+                    if is_trusted:
+                        result['trusted_connections'].append(connection_info)
+                    else:
+                        result['external_connections'].append(connection_info)
+
+                elif category == self.CAT_PIP:
+                    result['pip_installs'].append(
+                        PipInstallHit(line_number, match.group(1), raw_line, pattern))
+
+                else:  # CAT_LOGGING
+                    result['logging_config'].append(
+                        LoggingConfigHit(line_number, raw_line, pattern))
     
+    def _register_session(self, index: int, session: Dict, tasks: List, total=None):
+        """Append one session's result skeleton and queue its file scans"""
+        progress = f"{index + 1}/{total}" if total is not None else f"{index + 1}"
+        print(f"\n* Analyzing session {progress}")
+        print(f"Notebook: {session.get('notebook_name', 'Unknown')}")
+        print(f"Livy ID: {session.get('livy_id', 'Unknown')}")
+
+        session_result = {
+            'session_info': {
+                'notebook_name': session.get('notebook_name', 'Unknown'),
+                'notebook_id': session.get('notebook_id', 'Unknown'),
+                'workspace_name': session.get('workspace_name', 'Unknown'),
+                'workspace_id': session.get('workspace_id', 'Unknown'),
+                'spark_application_id': session.get('spark_application_id', 'Unknown'),
+                'livy_id': session.get('livy_id', 'Unknown'),
+                'app_url': session.get('app_url', 'Unknown'),
+                'temp_directory': session.get('temp_directory', 'Unknown'),
+                'download_timestamp': session.get('download_timestamp', 'Unknown')
+            },
+            'log_analyses': {}
+        }
+
+        # Analyze each log file for this session
+        downloaded_files = session.get('downloaded_files', [])
+        for log_file in downloaded_files:
+            log_type = 'unknown'
+            if 'livy_logs' in log_file:
+                log_type = 'livy'
+            elif 'stdout' in log_file:
+                log_type = 'stdout'
+            elif 'stderr' in log_file:
+                log_type = 'stderr'
+
+            print(f"  > Analyzing {log_type}: {os.path.basename(log_file)}")
+            tasks.append((index, log_type, log_file))
+
+        self.session_results.append(session_result)
+
     def analyze_consolidated_logs(self) -> List[Dict]:
         """Analyze all logs from consolidated JSON file"""
         if not self.consolidated_file_path:
             raise ValueError("No consolidated file path provided")
-            
+
         print(f"Loading consolidated log file: {self.consolidated_file_path}")
-        
+
+        # Very large consolidated files are iterated session by session so
+        # peak memory stays near one session record, not the whole document
+        try:
+            if (ijson is not None and
+                    os.path.getsize(self.consolidated_file_path) > self._STREAM_THRESHOLD_BYTES):
+                return self.analyze_stream(self.consolidated_file_path)
+        except FileNotFoundError:
+            print(f"Error: Consolidated file not found: {self.consolidated_file_path}")
+            sys.exit(1)
+
         try:
-            with open(self.consolidated_file_path, 'r') as f:
-                consolidated_data = json.load(f)
+            with open(self.consolidated_file_path, 'rb') as f:
+                consolidated_data = _json_loads(f.read())
         except FileNotFoundError:
             print(f"Error: Consolidated file not found: {self.consolidated_file_path}")
             sys.exit(1)
         except Exception as e:
             print(f"Error reading consolidated file: {e}")
             sys.exit(1)
-        
+
         log_summaries = consolidated_data.get('log_summaries', [])
         print(f"Found {len(log_summaries)} sessions to analyze")
-        
+
+        # New results invalidate any cached summary views
+        self._agg = None
+
+        # Collect every (session, log type, path) triple first so the file
+        # scans - independent, CPU-bound regex work - can be dispatched
+        # across all cores instead of running one file at a time
+        tasks = []
+
         for i, session in enumerate(log_summaries):
-            print(f"\n* Analyzing session {i+1}/{len(log_summaries)}")
-            print(f"Notebook: {session.get('notebook_name', 'Unknown')}")
-            print(f"Livy ID: {session.get('livy_id', 'Unknown')}")
-            
-            session_result = {
-                'session_info': {
-                    'notebook_name': session.get('notebook_name', 'Unknown'),
-                    'notebook_id': session.get('notebook_id', 'Unknown'),
-                    'workspace_name': session.get('workspace_name', 'Unknown'),
-                    'workspace_id': session.get('workspace_id', 'Unknown'),
-                    'spark_application_id': session.get('spark_application_id', 'Unknown'),
-                    'livy_id': session.get('livy_id', 'Unknown'),
-                    'app_url': session.get('app_url', 'Unknown'),
-                    'temp_directory': session.get('temp_directory', 'Unknown'),
-                    'download_timestamp': session.get('download_timestamp', 'Unknown')
-                },
-                'log_analyses': {}
-            }
-            
-            # Analyze each log file for this session
-            downloaded_files = session.get('downloaded_files', [])
-            for log_file in downloaded_files:
-                log_type = 'unknown'
-                if 'livy_logs' in log_file:
-                    log_type = 'livy'
-                elif 'stdout' in log_file:
-                    log_type = 'stdout'
-                elif 'stderr' in log_file:
-                    log_type = 'stderr'
-                
-                print(f"  > Analyzing {log_type}: {os.path.basename(log_file)}")
-                analysis = self.analyze_single_log_file(log_file)
-                session_result['log_analyses'][log_type] = analysis
-            
-            self.session_results.append(session_result)
-        
+            self._register_session(i, session, tasks, total=len(log_summaries))
+
+        self._run_scan_tasks(tasks)
         return self.session_results
-    
-    def get_sessions_with_external_connections(self) -> List[Dict]:
-        """Get sessions that have truly external (non-trusted) connections"""
+
+    def analyze_stream(self, consolidated_file_path: str) -> List[Dict]:
+        """
+        Analyze a consolidated file by streaming its sessions with ijson.
+
+        Each log_summaries entry is parsed, registered, and discarded
+        before the next one is read, so multi-GB consolidated files never
+        exist in memory as a single document.
+        """
+        if ijson is None:
+            raise RuntimeError("ijson is not installed; use analyze_consolidated_logs")
+
+        self._agg = None
+        tasks = []
+
+        try:
+            with open(consolidated_file_path, 'rb') as f:
+                for i, session in enumerate(ijson.items(f, 'log_summaries.item')):
+                    self._register_session(i, session, tasks)
+        except FileNotFoundError:
+            print(f"Error: Consolidated file not found: {consolidated_file_path}")
+            sys.exit(1)
+        except Exception as e:
+            print(f"Error reading consolidated file: {e}")
+            sys.exit(1)
+
+        self._run_scan_tasks(tasks)
+        return self.session_results
+
+    def analyze_session(self, session: Dict) -> Dict:
+        """
+        Register and scan one session summary as it arrives.
+
+        Incremental counterpart to analyze_consolidated_logs for callers
+        that overlap extraction and analysis: each session is scanned
+        while later ones are still downloading. A session is at most
+        three files, so the scans run inline - spawning a process pool
+        per session would cost more than the work it parallelizes.
+        """
+        self._agg = None
+        tasks = []
+        self._register_session(len(self.session_results), session, tasks)
+        for session_idx, log_type, log_file in tasks:
+            analysis = self.analyze_single_log_file(log_file, log_type)
+            self.session_results[session_idx]['log_analyses'][log_type] = analysis
+        return self.session_results[-1]
+
+    def _run_scan_tasks(self, tasks: List):
+        """Dispatch queued (session index, log type, path) scans"""
+        if len(tasks) < 2:
+            # Not worth spawning a pool for a single file
+            for session_idx, log_type, log_file in tasks:
+                analysis = self.analyze_single_log_file(log_file, log_type)
+                self.session_results[session_idx]['log_analyses'][log_type] = analysis
+        else:
+            with ProcessPoolExecutor(
+                    max_workers=min(os.cpu_count() or 1, len(tasks)),
+                    initializer=_init_analysis_worker,
+                    initargs=(self.trusted_domains, self.dedup_connections)) as executor:
+                paths = [task[2] for task in tasks]
+                log_types = [task[1] for task in tasks]
+                for (session_idx, log_type, _), analysis in zip(
+                        tasks, executor.map(_analyze_log_file_worker, paths, log_types,
+                                            chunksize=4)):
+                    self.session_results[session_idx]['log_analyses'][log_type] = analysis
+
+    def _aggregate(self) -> Dict:
+        """
+        Build every summary view in one walk over session_results.
+
+        print_comprehensive_summary and the exports each need several of
+        these views; the previous per-view methods ran four near-identical
+        loops over the same data. The result is cached until the next
+        analyze_consolidated_logs run, so the console summary, the JSON
+        export, and the text export triggered by one CLI invocation all
+        share a single pass over session_results.
+        """
+        if self._agg is not None:
+            return self._agg
+
         sessions_with_external = []
-        
-        for session in self.session_results:
-            has_external = False
-            total_external = 0
-            total_trusted = 0
-            
-            for log_type, analysis in session['log_analyses'].items():
-                if analysis.get('external_connections'):
-                    has_external = True
-                    total_external += len(analysis['external_connections'])
-                if analysis.get('trusted_connections'):
-                    total_trusted += len(analysis['trusted_connections'])
-            
-            if has_external:
-                session_summary = {
-                    'notebook_name': session['session_info']['notebook_name'],
-                    'notebook_id': session['session_info']['notebook_id'],
-                    'livy_id': session['session_info']['livy_id'],
-                    'workspace_name': session['session_info']['workspace_name'],
-                    'app_url': session['session_info']['app_url'],
-                    'total_external_connections': total_external,
-                    'total_trusted_connections': total_trusted,
-                    'external_connection_details': {},
-                    'trusted_connection_details': {}
-                }
-                
-                for log_type, analysis in session['log_analyses'].items():
-                    if analysis.get('external_connections'):
-                        session_summary['external_connection_details'][log_type] = analysis['external_connections']
-                    if analysis.get('trusted_connections'):
-                        session_summary['trusted_connection_details'][log_type] = analysis['trusted_connections']
-                
-                sessions_with_external.append(session_summary)
-        
-        return sessions_with_external
-    
-    def get_sessions_with_outbound_connections(self) -> List[Dict]:
-        """Get sessions that have any outbound connections (includes both trusted and external)"""
         sessions_with_connections = []
-        
+        sessions_with_pip = []
+        logging_summary = {
+            'sessions_with_logging_config': 0,
+            'sessions_with_disabled_logs': 0,
+            'details': []
+        }
+
         for session in self.session_results:
-            has_connections = False
+            info = session['session_info']
+
             total_connections = 0
             total_external = 0
             total_trusted = 0
-            
+            total_pip_installs = 0
+            connection_details = {}
+            external_details = {}
+            trusted_details = {}
+            pip_details = {}
+            logging_configs = {}
+            has_disabled_logs = False
+
             for log_type, analysis in session['log_analyses'].items():
                 if analysis.get('connections'):
-                    has_connections = True
                     total_connections += len(analysis['connections'])
+                    connection_details[log_type] = analysis['connections']
                 if analysis.get('external_connections'):
                     total_external += len(analysis['external_connections'])
+                    external_details[log_type] = analysis['external_connections']
                 if analysis.get('trusted_connections'):
                     total_trusted += len(analysis['trusted_connections'])
-            
-            if has_connections:
-                session_summary = {
-                    'notebook_name': session['session_info']['notebook_name'],
-                    'notebook_id': session['session_info']['notebook_id'],
-                    'livy_id': session['session_info']['livy_id'],
-                    'workspace_name': session['session_info']['workspace_name'],
-                    'app_url': session['session_info']['app_url'],
-                    'total_connections': total_connections,
-                    'total_external_connections': total_external,
-                    'total_trusted_connections': total_trusted,
-                    'connection_details': {},
-                    'external_connection_details': {},
-                    'trusted_connection_details': {}
-                }
-                
-                for log_type, analysis in session['log_analyses'].items():
-                    if analysis.get('connections'):
-                        session_summary['connection_details'][log_type] = analysis['connections']
-                    if analysis.get('external_connections'):
-                        session_summary['external_connection_details'][log_type] = analysis['external_connections']
-                    if analysis.get('trusted_connections'):
-                        session_summary['trusted_connection_details'][log_type] = analysis['trusted_connections']
-                
-                sessions_with_connections.append(session_summary)
-        
-        return sessions_with_connections
-    
-    def get_sessions_with_pip_installs(self) -> List[Dict]:
-        """Get sessions that have pip installations"""
-        sessions_with_pip = []
-        
-        for session in self.session_results:
-            has_pip = False
-            total_pip_installs = 0
-            
-            for log_type, analysis in session['log_analyses'].items():
+                    trusted_details[log_type] = analysis['trusted_connections']
                 if analysis.get('pip_installs'):
-                    has_pip = True
                     total_pip_installs += len(analysis['pip_installs'])
-            
-            if has_pip:
-                session_summary = {
-                    'notebook_name': session['session_info']['notebook_name'],
-                    'notebook_id': session['session_info']['notebook_id'],
-                    'livy_id': session['session_info']['livy_id'],
-                    'workspace_name': session['session_info']['workspace_name'],
-                    'total_pip_installs': total_pip_installs,
-                    'pip_details': {}
-                }
-                
-                for log_type, analysis in session['log_analyses'].items():
-                    if analysis.get('pip_installs'):
-                        session_summary['pip_details'][log_type] = analysis['pip_installs']
-                
-                sessions_with_pip.append(session_summary)
-        
-        return sessions_with_pip
-    
-    def get_logging_status_summary(self) -> Dict:
-        """Get summary of logging configurations across all sessions"""
-        logging_summary = {
-            'sessions_with_logging_config': 0,
-            'sessions_with_disabled_logs': 0,
-            'details': []
-        }
-        
-        for session in self.session_results:
-            has_logging_config = False
-            has_disabled_logs = False
-            
-            for log_type, analysis in session['log_analyses'].items():
+                    pip_details[log_type] = analysis['pip_installs']
                 if analysis.get('logging_config'):
-                    has_logging_config = True
+                    logging_configs[log_type] = analysis['logging_config']
                     # Check if logs are disabled
                     for log_config in analysis['logging_config']:
-                        if any(keyword in log_config['raw_line'].lower() 
+                        if any(keyword in log_config.raw_line.lower()
                                for keyword in ['disable', 'off', 'false']):
                             has_disabled_logs = True
-            
-            if has_logging_config:
+
+            if total_connections:
+                sessions_with_connections.append({
+                    'notebook_name': info['notebook_name'],
+                    'notebook_id': info['notebook_id'],
+                    'livy_id': info['livy_id'],
+                    'workspace_name': info['workspace_name'],
+                    'app_url': info['app_url'],
+                    'total_connections': total_connections,
+                    'total_external_connections': total_external,
+                    'total_trusted_connections': total_trusted,
+                    'connection_details': connection_details,
+                    'external_connection_details': external_details,
+                    'trusted_connection_details': trusted_details
+                })
+
+            if total_external:
+                # Precomputed once here; the console summary, text export,
+                # and --external-only listing all show the same host list
+                # Dedup on (host, port) tuples - hashing two interned
+                # strings beats building a throwaway host:port string per
+                # duplicate - and format only the survivors
+                unique_pairs = {(conn.host, conn.port)
+                                for connections in external_details.values()
+                                for conn in connections}
+                unique_hostports = tuple(sorted(
+                    f"{host}:{port}" if port else host
+                    for host, port in unique_pairs))
+                sessions_with_external.append({
+                    'notebook_name': info['notebook_name'],
+                    'notebook_id': info['notebook_id'],
+                    'livy_id': info['livy_id'],
+                    'workspace_name': info['workspace_name'],
+                    'app_url': info['app_url'],
+                    'total_external_connections': total_external,
+                    'total_trusted_connections': total_trusted,
+                    'unique_external_hostports': unique_hostports,
+                    'external_connection_details': external_details,
+                    'trusted_connection_details': trusted_details
+                })
+
+            if total_pip_installs:
+                sessions_with_pip.append({
+                    'notebook_name': info['notebook_name'],
+                    'notebook_id': info['notebook_id'],
+                    'livy_id': info['livy_id'],
+                    'workspace_name': info['workspace_name'],
+                    'total_pip_installs': total_pip_installs,
+                    'pip_details': pip_details
+                })
+
+            if logging_configs:
                 logging_summary['sessions_with_logging_config'] += 1
-                session_detail = {
-                    'notebook_name': session['session_info']['notebook_name'],
-                    'livy_id': session['session_info']['livy_id'],
+                logging_summary['details'].append({
+                    'notebook_name': info['notebook_name'],
+                    'livy_id': info['livy_id'],
                     'has_disabled_logs': has_disabled_logs,
-                    'logging_configs': {}
-                }
-                
-                for log_type, analysis in session['log_analyses'].items():
-                    if analysis.get('logging_config'):
-                        session_detail['logging_configs'][log_type] = analysis['logging_config']
-                
-                logging_summary['details'].append(session_detail)
-            
+                    'logging_configs': logging_configs
+                })
+
             if has_disabled_logs:
                 logging_summary['sessions_with_disabled_logs'] += 1
-        
-        return logging_summary
+
+        self._agg = {
+            'external': sessions_with_external,
+            'outbound': sessions_with_connections,
+            'pip': sessions_with_pip,
+            'logging': logging_summary
+        }
+        return self._agg
+
+    def get_sessions_with_external_connections(self) -> List[Dict]:
+        """Get sessions that have truly external (non-trusted) connections"""
+        return self._aggregate()['external']
+
+    def get_sessions_with_outbound_connections(self) -> List[Dict]:
+        """Get sessions that have any outbound connections (includes both trusted and external)"""
+        return self._aggregate()['outbound']
+
+    def get_sessions_with_pip_installs(self) -> List[Dict]:
+        """Get sessions that have pip installations"""
+        return self._aggregate()['pip']
+
+    def get_logging_status_summary(self) -> Dict:
+        """Get summary of logging configurations across all sessions"""
+        return self._aggregate()['logging']
     
     def print_comprehensive_summary(self):
         """Print comprehensive analysis summary"""
@@ -527,15 +983,7 @@ class SparkLogAnalyzer:
                 print(f"   >> Monitor URL: {session['app_url']}")
                 
                 # Show unique EXTERNAL hosts for this session
-                unique_external_hosts = set()
-                for log_type, connections in session['external_connection_details'].items():
-                    for conn in connections:
-                        host_port = conn['host']
-                        if conn.get('port'):
-                            host_port += f":{conn['port']}"
-                        unique_external_hosts.add(host_port)
-                
-                print(f"   >> External hosts: {', '.join(sorted(unique_external_hosts))}")
+                print(f"   >> External hosts: {', '.join(session['unique_external_hostports'])}")
                 print()
         else:
             print(f"\n+ EXTERNAL CONNECTIONS: No sessions found with external connections (all connections are to trusted services)")
@@ -580,23 +1028,39 @@ class SparkLogAnalyzer:
     
 
     
+    @staticmethod
+    def _write_json_array(f, items):
+        """Write a JSON array one element at a time"""
+        f.write('[')
+        for i, item in enumerate(items):
+            if i:
+                f.write(', ')
+            f.write(_json_dumps(item))
+        f.write(']')
+
     def export_to_json(self, output_file: str):
         """Export detailed results to JSON file"""
         try:
-            export_data = {
-                'analysis_timestamp': datetime.now().isoformat(),
-                'total_sessions': len(self.session_results),
-                'sessions_with_outbound_connections': self.get_sessions_with_outbound_connections(),
-                'sessions_with_pip_installs': self.get_sessions_with_pip_installs(),
-                'logging_status_summary': self.get_logging_status_summary(),
-                'detailed_session_results': self.session_results
-            }
-            
+            # Stream the document section by section instead of assembling
+            # one export dict and handing it to a single json.dump call, so
+            # peak memory stays near one session record instead of a second
+            # full copy of the dataset
             with open(output_file, 'w', encoding='utf-8') as f:
-                json.dump(export_data, f, indent=2)
-            
+                f.write('{"analysis_timestamp": ')
+                f.write(_json_dumps(datetime.now().isoformat()))
+                f.write(f', "total_sessions": {len(self.session_results)}')
+                f.write(', "sessions_with_outbound_connections": ')
+                self._write_json_array(f, self.get_sessions_with_outbound_connections())
+                f.write(', "sessions_with_pip_installs": ')
+                self._write_json_array(f, self.get_sessions_with_pip_installs())
+                f.write(', "logging_status_summary": ')
+                f.write(_json_dumps(self.get_logging_status_summary()))
+                f.write(', "detailed_session_results": ')
+                self._write_json_array(f, self.session_results)
+                f.write('}')
+
             print(f"\n+ Detailed results exported to: {output_file}")
-        
+
         except Exception as e:
             print(f"- Error exporting results: {e}")
     
@@ -612,60 +1076,67 @@ class SparkLogAnalyzer:
             sessions_with_external = self.get_sessions_with_external_connections()
             sessions_with_all = self.get_sessions_with_outbound_connections()
             
-            with open(export_path, 'w', encoding='utf-8') as f:
-                f.write("SPARK SESSION ANALYSIS - EXTERNAL CONNECTIONS SUMMARY\n")
-                f.write("="*80 + "\n\n")
-                
-                f.write(f"Analysis Date: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-                f.write(f"Total Sessions Analyzed: {len(self.session_results)}\n")
-                f.write(f"Sessions with ANY Outbound Connections: {len(sessions_with_all)}\n")
-                f.write(f"Sessions with EXTERNAL Connections: {len(sessions_with_external)}\n")
-                f.write(f"Trusted Domains Configured: {len(self.trusted_domains)}\n\n")
-                
-                f.write("TRUSTED DOMAINS/PATTERNS:\n")
-                f.write("-" * 30 + "\n")
-                for domain in sorted(self.trusted_domains):
-                    f.write(f"  • {domain}\n")
-                f.write("\n")
-                
-                if sessions_with_external:
-                    f.write("!!! SESSIONS WITH EXTERNAL CONNECTIONS (SECURITY REVIEW NEEDED) !!!\n")
-                    f.write("="*70 + "\n")
-                    
-                    for i, session in enumerate(sessions_with_external, 1):
-                        f.write(f"\n{i}. Notebook: {session['notebook_name']}\n")
-                        f.write(f"   Livy ID: {session['livy_id']}\n")
-                        f.write(f"   Workspace: {session['workspace_name']}\n")
-                        f.write(f"   External Connections: {session['total_external_connections']}\n")
-                        f.write(f"   Trusted Connections: {session['total_trusted_connections']}\n")
-                        f.write(f"   Monitor URL: {session['app_url']}\n")
-                        
-                        # List unique EXTERNAL hosts only
-                        unique_external_hosts = set()
-                        for log_type, connections in session['external_connection_details'].items():
-                            for conn in connections:
-                                host_port = conn['host']
-                                if conn.get('port'):
-                                    host_port += f":{conn['port']}"
-                                unique_external_hosts.add(host_port)
-                        
-                        if unique_external_hosts:
-                            f.write(f"   !!! EXTERNAL HOSTS: {', '.join(sorted(unique_external_hosts))}\n")
-                        f.write(f"   {'-' * 60}\n")
-                else:
-                    f.write("+ NO EXTERNAL CONNECTIONS FOUND\n")
-                    f.write("All detected connections are to trusted Microsoft Fabric/Azure services.\n\n")
-                
-                # Summary of all connections for reference
-                if sessions_with_all:
-                    f.write("\n=== ALL SESSIONS SUMMARY (Including Trusted) ===\n")
-                    f.write("-" * 50 + "\n")
-                    for session in sessions_with_all:
-                        external_count = session.get('total_external_connections', 0)
-                        trusted_count = session.get('total_trusted_connections', 0)
-                        status = "! HAS EXTERNAL" if external_count > 0 else "+ TRUSTED ONLY"
-                        f.write(f"   {session['notebook_name']} ({session['livy_id']}) - {status}\n")
-                        f.write(f"      External: {external_count}, Trusted: {trusted_count}\n")
+            # Accumulate the report and write it in one shot; per-line
+            # f.write calls each pay buffered-IO dispatch overhead, which
+            # adds up on exports covering many sessions and is worst on
+            # networked filesystems where each flush is a round-trip
+            parts = []
+            append = parts.append
+
+            append("SPARK SESSION ANALYSIS - EXTERNAL CONNECTIONS SUMMARY\n")
+            append("="*80 + "\n\n")
+
+            append(f"Analysis Date: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
+            append(f"Total Sessions Analyzed: {len(self.session_results)}\n")
+            append(f"Sessions with ANY Outbound Connections: {len(sessions_with_all)}\n")
+            append(f"Sessions with EXTERNAL Connections: {len(sessions_with_external)}\n")
+            append(f"Trusted Domains Configured: {len(self.trusted_domains)}\n\n")
+
+            append("TRUSTED DOMAINS/PATTERNS:\n")
+            append("-" * 30 + "\n")
+            for domain in self.trusted_domains:  # property is already sorted
+                append(f"  • {domain}\n")
+            append("\n")
+
+            if sessions_with_external:
+                append("!!! SESSIONS WITH EXTERNAL CONNECTIONS (SECURITY REVIEW NEEDED) !!!\n")
+                append("="*70 + "\n")
+
+                for i, session in enumerate(sessions_with_external, 1):
+                    append(f"\n{i}. Notebook: {session['notebook_name']}\n")
+                    append(f"   Livy ID: {session['livy_id']}\n")
+                    append(f"   Workspace: {session['workspace_name']}\n")
+                    append(f"   External Connections: {session['total_external_connections']}\n")
+                    append(f"   Trusted Connections: {session['total_trusted_connections']}\n")
+                    append(f"   Monitor URL: {session['app_url']}\n")
+
+                    # List unique EXTERNAL hosts only
+                    if session['unique_external_hostports']:
+                        append(f"   !!! EXTERNAL HOSTS: {', '.join(session['unique_external_hostports'])}\n")
+                    append(f"   {'-' * 60}\n")
+            else:
+                append("+ NO EXTERNAL CONNECTIONS FOUND\n")
+                append("All detected connections are to trusted Microsoft Fabric/Azure services.\n\n")
+
+            # Summary of all connections for reference
+            if sessions_with_all:
+                append("\n=== ALL SESSIONS SUMMARY (Including Trusted) ===\n")
+                append("-" * 50 + "\n")
+                # Partition once so each loop emits a constant status
+                # string with no per-session branch
+                has_external = [s for s in sessions_with_all
+                                if s.get('total_external_connections', 0)]
+                trusted_only = [s for s in sessions_with_all
+                                if not s.get('total_external_connections', 0)]
+                for status, bucket in (("! HAS EXTERNAL", has_external),
+                                       ("+ TRUSTED ONLY", trusted_only)):
+                    for session in bucket:
+                        append(f"   {session['notebook_name']} ({session['livy_id']}) - {status}\n")
+                        append(f"      External: {session.get('total_external_connections', 0)}, "
+                               f"Trusted: {session.get('total_trusted_connections', 0)}\n")
+
+            with open(export_path, 'w', encoding='utf-8', buffering=1 << 20) as f:
+                f.write("".join(parts))
             
             print_success(f"External connections summary exported to: {highlight(export_path)}")
         
@@ -673,6 +1144,130 @@ class SparkLogAnalyzer:
             print(f"- Error exporting summary: {e}")
 
 
+# Per-process analyzer built once by the pool initializer, so compiled
+# union regexes and trust structures are not repickled for every task
+_worker_analyzer = None
+
+
+def _init_analysis_worker(trusted_domains, dedup_connections=True):
+    global _worker_analyzer
+    _worker_analyzer = SparkLogAnalyzer(trusted_domains=trusted_domains,
+                                        dedup_connections=dedup_connections)
+
+
+def _analyze_log_file_worker(log_file_path, log_type=None):
+    return _worker_analyzer.analyze_single_log_file(log_file_path, log_type)
+
+
+def analyze(consolidated_file=None, external_only=False, connections_only=False,
+            export_json=None, export_summary=None, additional_trusted_domains=None,
+            dedup_connections=True) -> int:
+    """
+    Programmatic entry point mirroring the command line; returns a
+    process-style exit code.
+
+    Callers that already run in Python (the security pipeline) invoke
+    this directly instead of spawning a second interpreter per analysis,
+    which skips startup plus a duplicate import of every module here.
+    """
+    # Find consolidated file if not provided
+    if not consolidated_file:
+        # Look for consolidated files in output directory first, then current directory.
+        # scandir yields DirEntry objects whose type checks come from the
+        # directory read itself, so no extra stat per candidate, and max()
+        # over the timestamped names avoids sorting the whole list
+        search_dirs = ['output', '.']
+        consolidated_files = []
+
+        for search_dir in search_dirs:
+            if os.path.isdir(search_dir):
+                with os.scandir(search_dir) as entries:
+                    consolidated_files.extend(
+                        entry.path for entry in entries
+                        if entry.is_file()
+                        and entry.name.startswith('consolidated_spark_logs_')
+                        and entry.name.endswith('.json'))
+
+        if consolidated_files:
+            # Filenames embed the collection timestamp, so the max basename
+            # is the most recent one
+            consolidated_file = max(consolidated_files, key=os.path.basename)
+            print_info(f"Auto-detected consolidated file: {highlight(os.path.basename(consolidated_file))}")
+        else:
+            print_error("No consolidated file found. Please specify the path or run your log collection script first.")
+            print_info("Expected file pattern: consolidated_spark_logs_YYYYMMDD_HHMMSS.json")
+            print_info("Looking in: output/ and current directory")
+            return 1
+
+    # Create analyzer with additional trusted domains if specified
+    analyzer = SparkLogAnalyzer(consolidated_file, dedup_connections=dedup_connections)
+    if additional_trusted_domains:
+        analyzer.add_trusted_domains(additional_trusted_domains)
+        print(f"+ Added {len(additional_trusted_domains)} additional trusted domains")
+
+    print_header(f"{Emoji.MAGNIFY} COMPREHENSIVE SPARK SESSION ANALYSIS {Emoji.SHIELD}", 70)
+    try:
+        analyzer.analyze_consolidated_logs()
+    except SystemExit as e:
+        # The load paths exit on unreadable input; translate that into a
+        # return code so in-process callers survive
+        return e.code if isinstance(e.code, int) else 1
+
+    # Print results based on user preference
+    if external_only:
+        sessions_with_external = analyzer.get_sessions_with_external_connections()
+        print(f"\n!!! SESSIONS WITH EXTERNAL CONNECTIONS ({len(sessions_with_external)}) !!!")
+
+        if sessions_with_external:
+            # One buffered write per session instead of 5-6 print calls,
+            # each of which re-locks and may flush stdout
+            _write = sys.stdout.write
+            for session in sessions_with_external:
+                msg = (
+                    f"> {session['notebook_name']} (Livy ID: {session['livy_id']})\n"
+                    f"   Workspace: {session['workspace_name']}\n"
+                    f"   External: {session['total_external_connections']}, Trusted: {session['total_trusted_connections']}\n"
+                    f"   Monitor: {session['app_url']}\n"
+                )
+                # Show external hosts
+                if session['unique_external_hostports']:
+                    msg += f"   {Emoji.TARGET} External hosts: {', '.join(session['unique_external_hostports'])}\n"
+                _write(msg + "\n")
+        else:
+            print(f"+ No sessions found with external connections (all connections are to trusted services)")
+
+    elif connections_only:
+        sessions_with_connections = analyzer.get_sessions_with_outbound_connections()
+        print(f"\n{Emoji.globe} SESSIONS WITH ANY OUTBOUND CONNECTIONS ({len(sessions_with_connections)}):")
+
+        if sessions_with_connections:
+            _write = sys.stdout.write
+            for session in sessions_with_connections:
+                external_count = session.get('total_external_connections', 0)
+                trusted_count = session.get('total_trusted_connections', 0)
+                status = f"{Emoji.warning} HAS EXTERNAL" if external_count > 0 else f"{Emoji.check_mark} TRUSTED ONLY"
+
+                _write(
+                    f"📒 {session['notebook_name']} (Livy ID: {session['livy_id']}) - {status}\n"
+                    f"   🏢 Workspace: {session['workspace_name']}\n"
+                    f"   {Emoji.warning} External: {external_count}, {Emoji.check_mark} Trusted: {trusted_count}\n"
+                    f"   🖥️  Monitor: {session['app_url']}\n\n"
+                )
+        else:
+            print("✅ No sessions found with outbound connections")
+    else:
+        analyzer.print_comprehensive_summary()
+
+    # Export if requested
+    if export_json:
+        analyzer.export_to_json(export_json)
+
+    if export_summary:
+        analyzer.export_summary_to_text(export_summary)
+
+    return 0
+
+
 def main():
     parser = argparse.ArgumentParser(
         description='Analyze Spark session logs for outbound connections, pip installs, and logging status'
@@ -714,6 +1309,11 @@ def main():
         action='store_true',
         help='List all configured trusted domains and exit'
     )
+    parser.add_argument(
+        '--no-dedup',
+        action='store_true',
+        help='Record every connection line instead of deduplicating repeated (host, port) endpoints'
+    )
     
     args = parser.parse_args()
     
@@ -721,99 +1321,23 @@ def main():
     if args.list_trusted_domains:
         analyzer = SparkLogAnalyzer()  # Create analyzer just to get default domains
         if args.add_trusted_domain:
-            analyzer.trusted_domains.extend(args.add_trusted_domain)
+            analyzer.add_trusted_domains(args.add_trusted_domain)
         
         print_header(f"{Emoji.SHIELD} CONFIGURED TRUSTED DOMAINS/PATTERNS", 50)
-        for i, domain in enumerate(sorted(analyzer.trusted_domains), 1):
+        for i, domain in enumerate(analyzer.trusted_domains, 1):
             print(f"{i:2d}. {domain}")
         print(f"\nTotal: {len(analyzer.trusted_domains)} trusted domains/patterns")
         sys.exit(0)
-    
-    # Find consolidated file if not provided
-    consolidated_file = args.consolidated_file
-    if not consolidated_file:
-        # Look for consolidated files in output directory first, then current directory
-        search_dirs = ['output', '.']
-        consolidated_files = []
-        
-        for search_dir in search_dirs:
-            if os.path.exists(search_dir):
-                dir_files = [f for f in os.listdir(search_dir) if f.startswith('consolidated_spark_logs_') and f.endswith('.json')]
-                # Add full path to files
-                consolidated_files.extend([os.path.join(search_dir, f) for f in dir_files])
-        
-        if consolidated_files:
-            consolidated_file = sorted(consolidated_files)[-1]  # Get the most recent one
-            print_info(f"Auto-detected consolidated file: {highlight(os.path.basename(consolidated_file))}")
-        else:
-            print_error("No consolidated file found. Please specify the path or run your log collection script first.")
-            print_info("Expected file pattern: consolidated_spark_logs_YYYYMMDD_HHMMSS.json")
-            print_info("Looking in: output/ and current directory")
-            sys.exit(1)
-    
-    # Create analyzer with additional trusted domains if specified
-    additional_trusted = args.add_trusted_domain or []
-    analyzer = SparkLogAnalyzer(consolidated_file)
-    if additional_trusted:
-        analyzer.trusted_domains.extend(additional_trusted)
-        print(f"+ Added {len(additional_trusted)} additional trusted domains")
-    
-    print_header(f"{Emoji.MAGNIFY} COMPREHENSIVE SPARK SESSION ANALYSIS {Emoji.SHIELD}", 70)
-    analyzer.analyze_consolidated_logs()
-    
-    # Print results based on user preference
-    if args.external_only:
-        sessions_with_external = analyzer.get_sessions_with_external_connections()
-        print(f"\n!!! SESSIONS WITH EXTERNAL CONNECTIONS ({len(sessions_with_external)}) !!!")
-        
-        if sessions_with_external:
-            for session in sessions_with_external:
-                print(f"> {session['notebook_name']} (Livy ID: {session['livy_id']})")
-                print(f"   Workspace: {session['workspace_name']}")
-                print(f"   External: {session['total_external_connections']}, Trusted: {session['total_trusted_connections']}")
-                print(f"   Monitor: {session['app_url']}")
-                
-                # Show external hosts
-                unique_external_hosts = set()
-                for log_type, connections in session['external_connection_details'].items():
-                    for conn in connections:
-                        host_port = conn['host']
-                        if conn.get('port'):
-                            host_port += f":{conn['port']}"
-                        unique_external_hosts.add(host_port)
-                
-                if unique_external_hosts:
-                    print(f"   {Emoji.TARGET} External hosts: {', '.join(sorted(unique_external_hosts))}")
-                print()
-        else:
-            print(f"+ No sessions found with external connections (all connections are to trusted services)")
-    
-    elif args.connections_only:
-        sessions_with_connections = analyzer.get_sessions_with_outbound_connections()
-        print(f"\n{Emoji.globe} SESSIONS WITH ANY OUTBOUND CONNECTIONS ({len(sessions_with_connections)}):")
-        
-        if sessions_with_connections:
-            for session in sessions_with_connections:
-                external_count = session.get('total_external_connections', 0)
-                trusted_count = session.get('total_trusted_connections', 0)
-                status = f"{Emoji.warning} HAS EXTERNAL" if external_count > 0 else f"{Emoji.check_mark} TRUSTED ONLY"
-                
-                print(f"📒 {session['notebook_name']} (Livy ID: {session['livy_id']}) - {status}")
-                print(f"   🏢 Workspace: {session['workspace_name']}")
-                print(f"   {Emoji.warning} External: {external_count}, {Emoji.check_mark} Trusted: {trusted_count}")
-                print(f"   🖥️  Monitor: {session['app_url']}")
-                print()
-        else:
-            print("✅ No sessions found with outbound connections")
-    else:
-        analyzer.print_comprehensive_summary()
-    
-    # Export if requested
-    if args.export_json:
-        analyzer.export_to_json(args.export_json)
-    
-    if args.export_summary:
-        analyzer.export_summary_to_text(args.export_summary)
+
+    sys.exit(analyze(
+        args.consolidated_file,
+        external_only=args.external_only,
+        connections_only=args.connections_only,
+        export_json=args.export_json,
+        export_summary=args.export_summary,
+        additional_trusted_domains=args.add_trusted_domain or [],
+        dedup_connections=not args.no_dedup,
+    ))
 
 
 if __name__ == '__main__':
@@ -7,6 +7,7 @@ Provides consistent, colorful output with PowerShell/Bash compatible emojis.
 
 import sys
 import os
+import types
 
 class Colors:
     """ANSI color codes for cross-platform terminal coloring"""
@@ -53,9 +54,13 @@ class Colors:
     @classmethod
     def disable(cls):
         """Disable colors for terminals that don't support them"""
-        for attr in dir(cls):
-            if not attr.startswith('_') and attr != 'disable':
-                setattr(cls, attr, '')
+        for attr in cls._ALL:
+            setattr(cls, attr, '')
+
+# Snapshot the color attribute names once at import so disable() walks a
+# small tuple instead of dir()-ing the whole class (which also pulls in
+# dunders and methods that then need filtering)
+Colors._ALL = tuple(name for name in vars(Colors) if name.isupper())
 
 # Disable colors if not in a supported terminal
 if os.getenv('NO_COLOR') or (sys.platform == 'win32' and os.getenv('TERM') != 'xterm'):
@@ -73,136 +78,72 @@ def _is_cmd_prompt():
     return not (os.getenv('WT_SESSION') or os.getenv('VSCODE_PID') or 
                 os.getenv('TERM') or os.getenv('ConEmuANSI'))
 
-# Create a singleton emoji instance that adapts to the terminal
-class _EmojiSingleton:
-    """Cross-platform compatible emojis for PowerShell and Bash"""
-    
-    def __init__(self):
-        self._use_ascii = _is_cmd_prompt()
-    
-    @property
-    def SUCCESS(self):
-        return "[+]" if self._use_ascii else "✓"
-    
-    @property
-    def ERROR(self):
-        return "[!]" if self._use_ascii else "✗"
-    
-    @property
-    def WARNING(self):
-        return "[*]" if self._use_ascii else "⚠"
-    
-    @property
-    def INFO(self):
-        return "[i]" if self._use_ascii else "ℹ"
-    
-    @property
-    def PROCESS(self):
-        return ">>>" if self._use_ascii else "▶"
-    
-    @property
-    def ROCKET(self):
-        return "=>" if self._use_ascii else "→"
-    
-    @property
-    def GEAR(self):
-        return "[*]" if self._use_ascii else "⚙"
-    
-    @property
-    def CLOCK(self):
-        return "[T]" if self._use_ascii else "⏱"
-    
-    @property
-    def TARGET(self):
-        return "(o)" if self._use_ascii else "◉"
-    
-    @property
-    def FOLDER(self):
-        return "[DIR]" if self._use_ascii else "📁"
-    
-    @property
-    def FILE(self):
-        return "[FILE]" if self._use_ascii else "📄"
-    
-    @property
-    def PACKAGE(self):
-        return "[PKG]" if self._use_ascii else "📦"
-    
-    @property
-    def MAGNIFY(self):
-        return "[SCAN]" if self._use_ascii else "🔍"
-    
-    @property
-    def CHART(self):
-        return "[STATS]" if self._use_ascii else "📊"
-    
-    @property
-    def SHIELD(self):
-        return "[SEC]" if self._use_ascii else "🛡"
-    
-    @property
-    def KEY(self):
-        return "[KEY]" if self._use_ascii else "🔑"
-    
-    @property
-    def LOCK(self):
-        return "[LOCK]" if self._use_ascii else "🔒"
-    
-    @property
-    def UNLOCK(self):
-        return "[OPEN]" if self._use_ascii else "🔓"
-    
-    @property
-    def GLOBE(self):
-        return "[NET]" if self._use_ascii else "🌐"
-    
-    @property
-    def LINK(self):
-        return "[LINK]" if self._use_ascii else "🔗"
-    
-    @property
-    def WIFI(self):
-        return "[WIFI]" if self._use_ascii else "📡"
-    
-    @property  
-    def warning(self):
-        return "[!]" if self._use_ascii else "🚨"
-    
-    @property
-    def check_mark(self):
-        return "[OK]" if self._use_ascii else "✅"
-    
-    @property
-    def globe(self):
-        return "[NET]" if self._use_ascii else "🌐"
-
-# Create the singleton instance
-Emoji = _EmojiSingleton()
+# (ascii, unicode) glyph pairs; the terminal can't change mid-process, so
+# the choice is resolved once at import instead of per property access
+_GLYPHS = {
+    'SUCCESS': ("[+]", "✓"),
+    'ERROR': ("[!]", "✗"),
+    'WARNING': ("[*]", "⚠"),
+    'INFO': ("[i]", "ℹ"),
+    'PROCESS': (">>>", "▶"),
+    'ROCKET': ("=>", "→"),
+    'GEAR': ("[*]", "⚙"),
+    'CLOCK': ("[T]", "⏱"),
+    'TARGET': ("(o)", "◉"),
+    'FOLDER': ("[DIR]", "📁"),
+    'FILE': ("[FILE]", "📄"),
+    'PACKAGE': ("[PKG]", "📦"),
+    'MAGNIFY': ("[SCAN]", "🔍"),
+    'CHART': ("[STATS]", "📊"),
+    'SHIELD': ("[SEC]", "🛡"),
+    'KEY': ("[KEY]", "🔑"),
+    'LOCK': ("[LOCK]", "🔒"),
+    'UNLOCK': ("[OPEN]", "🔓"),
+    'GLOBE': ("[NET]", "🌐"),
+    'LINK': ("[LINK]", "🔗"),
+    'WIFI': ("[WIFI]", "📡"),
+    'warning': ("[!]", "🚨"),
+    'check_mark': ("[OK]", "✅"),
+    'globe': ("[NET]", "🌐"),
+}
+
+# Create the singleton instance. Plain attributes on a SimpleNamespace make
+# every Emoji.X access a single __dict__ lookup instead of a property call
+# branching on _use_ascii each time.
+_use_ascii = _is_cmd_prompt()
+Emoji = types.SimpleNamespace(
+    **{name: pair[0] if _use_ascii else pair[1] for name, pair in _GLYPHS.items()}
+)
+
+# Color+emoji prefixes and the reset suffix are constant for the life of
+# the process, so build each once instead of re-interpolating four strings
+# per status line
+_SUCCESS_PREFIX = f"{Colors.BRIGHT_GREEN}{Emoji.SUCCESS} "
+_ERROR_PREFIX = f"{Colors.BRIGHT_RED}{Emoji.ERROR} "
+_WARNING_PREFIX = f"{Colors.BRIGHT_YELLOW}{Emoji.WARNING} "
+_INFO_PREFIX = f"{Colors.BRIGHT_CYAN}{Emoji.INFO} "
+_PROCESS_PREFIX = f"{Colors.BRIGHT_BLUE}{Emoji.PROCESS} "
+_SUFFIX_NL = f"{Colors.RESET}\n"
 
 def print_success(message: str, use_alt: bool = False):
     """Print success message in green with checkmark"""
-    emoji = Emoji.ALT_SUCCESS if use_alt else Emoji.SUCCESS
-    print(f"{Colors.BRIGHT_GREEN}{emoji} {message}{Colors.RESET}")
+    sys.stdout.write(_SUCCESS_PREFIX + message + _SUFFIX_NL)
 
 def print_error(message: str, use_alt: bool = False):
     """Print error message in red with X mark"""
-    emoji = Emoji.ALT_ERROR if use_alt else Emoji.ERROR
-    print(f"{Colors.BRIGHT_RED}{emoji} {message}{Colors.RESET}")
+    sys.stdout.write(_ERROR_PREFIX + message + _SUFFIX_NL)
 
 def print_warning(message: str, use_alt: bool = False):
     """Print warning message in yellow with warning sign"""
-    emoji = Emoji.ALT_WARNING if use_alt else Emoji.WARNING
-    print(f"{Colors.BRIGHT_YELLOW}{emoji} {message}{Colors.RESET}")
+    sys.stdout.write(_WARNING_PREFIX + message + _SUFFIX_NL)
 
 def print_info(message: str, use_alt: bool = False):
     """Print info message in cyan with info sign"""
-    emoji = Emoji.ALT_INFO if use_alt else Emoji.INFO
-    print(f"{Colors.BRIGHT_CYAN}{emoji} {message}{Colors.RESET}")
+    sys.stdout.write(_INFO_PREFIX + message + _SUFFIX_NL)
 
 def print_process(message: str, use_alt: bool = False):
     """Print process message in blue with arrow"""
-    emoji = Emoji.ALT_PROCESS if use_alt else Emoji.PROCESS
-    print(f"{Colors.BRIGHT_BLUE}{emoji} {message}{Colors.RESET}")
+    sys.stdout.write(_PROCESS_PREFIX + message + _SUFFIX_NL)
 
 def print_header(title: str, width: int = 70):
     """Print colored header with separators"""
@@ -5,23 +5,41 @@ Supports multiple authentication methods for your own credentials
 
 import os
 import json
+import time
+import logging
 import requests
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from requests.adapters import HTTPAdapter, Retry
 from datetime import datetime
-from azure.identity import (
-    ClientSecretCredential, 
-    InteractiveBrowserCredential, 
-    AzureCliCredential,
-)
 from dotenv import load_dotenv
 
+# azure.identity credential classes are imported inside the authenticate_*
+# methods that need them: the transitive MSAL/cryptography import tree is
+# heavy, and CLI paths that never authenticate shouldn't pay for it.
+
+logger = logging.getLogger(__name__)
+
 
 class FabricAuthenticator:
     """Handles various authentication methods for Microsoft Fabric API"""
-    
+
+    # Refresh tokens this many seconds before they expire
+    TOKEN_REFRESH_MARGIN = 300
+
     def __init__(self):
         self.token = None
         self.credential = None
         self.tenant_id = None
+        self._expires_at = 0
+
+        # Shared keep-alive session for Fabric API calls. Callers that use
+        # auth.session.get(url) reuse pooled TLS connections instead of
+        # paying a fresh handshake per request, with retries on transient
+        # throttling/gateway errors.
+        self.session = requests.Session()
+        retry = Retry(total=3, backoff_factor=0.3, status_forcelist=(429, 502, 503, 504))
+        self.session.mount('https://', HTTPAdapter(pool_connections=16, pool_maxsize=64,
+                                                   max_retries=retry))
         
         # Load environment variables
         script_dir = os.path.dirname(os.path.abspath(__file__))
@@ -51,6 +69,7 @@ class FabricAuthenticator:
             raise ValueError(f"Missing credentials: {', '.join(missing)}")
         
         print("🔐 Authenticating with Service Principal...")
+        from azure.identity import ClientSecretCredential
         self.credential = ClientSecretCredential(tenant_id, client_id, client_secret)
         self.tenant_id = tenant_id
         
@@ -66,6 +85,7 @@ class FabricAuthenticator:
         tenant_id = tenant_id or os.getenv('FABRICSPN_TENANTID') or os.getenv('AZURE_TENANT_ID')
         
         print("🌐 Opening browser for interactive authentication...")
+        from azure.identity import InteractiveBrowserCredential
         if tenant_id:
             self.credential = InteractiveBrowserCredential(tenant_id=tenant_id)
         else:
@@ -79,6 +99,7 @@ class FabricAuthenticator:
         Use Azure CLI credentials (requires 'az login' to be run first)
         """
         print("* Using Azure CLI credentials...")
+        from azure.identity import AzureCliCredential
         self.credential = AzureCliCredential()
         return self._get_token()
        
@@ -96,15 +117,18 @@ class FabricAuthenticator:
             
             for scope in scopes_to_try:
                 try:
-                    print(f"* Requesting token with scope: {scope}")
+                    # %-style args defer string construction (and the
+                    # exception stringification below) until debug is on
+                    logger.debug("Requesting token with scope: %s", scope)
                     token_response = self.credential.get_token(scope)
                     self.token = token_response.token
+                    self._expires_at = token_response.expires_on
                     expires_at = datetime.fromtimestamp(token_response.expires_on)
                     print(f"+ Token acquired successfully!")
                     print(f"   Expires at: {expires_at}")
                     return self.token
                 except Exception as e:
-                    print(f"❌ Failed with scope {scope}: {str(e)[:100]}")
+                    logger.debug("Failed with scope %s: %.100s", scope, e)
                     continue
             
             raise Exception("Failed to acquire token with any scope")
@@ -114,14 +138,35 @@ class FabricAuthenticator:
             raise
     
     def get_headers(self):
-        """Get HTTP headers with authorization token"""
-        if not self.token:
+        """Get HTTP headers with authorization token, refreshing it near expiry"""
+        if self.token is None or time.time() >= self._expires_at - self.TOKEN_REFRESH_MARGIN:
             self._get_token()
-        
-        return {
+
+        headers = {
             "Authorization": f"Bearer {self.token}",
             "Content-Type": "application/json"
         }
+        # Keep the shared session in sync so auth.session.get(url) works
+        # without passing headers per call
+        self.session.headers.update(headers)
+        return headers
+
+    def map(self, fn, urls, workers=16):
+        """
+        Run fn(url) for each URL across a thread pool, yielding results as
+        they complete.
+
+        Fabric REST calls are latency-bound, so N parallel requests finish
+        in roughly the slowest round-trip instead of the sum of all of
+        them. Pass self.session.get (the pooled session) as fn to fan out
+        plain GETs; get_headers() is called first so every worker reuses a
+        fresh bearer token.
+        """
+        self.get_headers()
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(fn, url) for url in urls]
+            for future in as_completed(futures):
+                yield future.result()
 
 if __name__ == "__main__":
     print()
\ No newline at end of file
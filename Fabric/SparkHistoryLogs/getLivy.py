@@ -5,21 +5,48 @@
 ################################################################
 
 import time
+import logging
 from datetime import datetime,timedelta
-from dateutil.parser import isoparse  
+from dateutil.parser import isoparse
 import requests
 import os
 import json
 import tempfile
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from azure.identity import ClientSecretCredential, InteractiveBrowserCredential,AzureCliCredential
 from fabric_auth import FabricAuthenticator
 from livyconn import LivyAPIConnector
 from console_utils import *
 
+# tqdm is optional; without it the per-notebook banners are kept as-is
+try:
+    from tqdm.auto import tqdm
+except ImportError:
+    tqdm = None
+
+logger = logging.getLogger("fabric.livy")
+
+
+def _detail(line):
+    """
+    Emit a per-notebook detail line without shredding the progress bar.
+
+    With tqdm active the banners are the dominant stdout traffic, so they
+    only appear (via tqdm.write, which repaints the bar) when debug
+    logging is on; without tqdm they print normally.
+    """
+    if tqdm is None:
+        print(line)
+    elif logger.isEnabledFor(logging.DEBUG):
+        tqdm.write(line)
+
 class SparkLogExtractor:
     """Class to extract Spark logs from all notebooks in a workspace"""
-    
+
+    # Concurrent notebook workers; capped to stay under Fabric API rate limits
+    NOTEBOOK_WORKERS = 8
+
     def __init__(self, workspace_id: str, auth_method: str = "cli"):
         """
         Initialize the log extractor
@@ -51,74 +78,52 @@ class SparkLogExtractor:
         # Test 2: Get notebooks and process all of them
         notebooks = self.connector.get_notebooks()
         if notebooks and 'value' in notebooks:
-            print_success(f"Found {highlight(str(len(notebooks['value'])))} notebooks")
-            
+            notebook_list = notebooks['value']
+            total_notebooks = len(notebook_list)
+            print_success(f"Found {highlight(str(total_notebooks))} notebooks")
+
             total_sessions_processed = 0
             notebooks_with_sessions = 0
-            
-            # Process each notebook
-            for notebook_idx, notebook in enumerate(notebooks['value']):
-                notebook_id = notebook['id']
-                notebook_name = notebook['displayName']
-                
-                print_subheader(f"{Emoji.PROCESS} Processing notebook {notebook_idx + 1}/{len(notebooks['value'])}", 60)
-                print(f"  {Colors.BRIGHT_CYAN}Name:{Colors.RESET} {highlight(notebook_name)}")
-                print(f"  {Colors.BRIGHT_CYAN}ID:{Colors.RESET} {Colors.BRIGHT_WHITE}{notebook_id}{Colors.RESET}")
-                
-                try:
-                    # Get Livy sessions for this notebook
-                    livy_sessions = self.connector.get_livy_sessions(notebook_id)
-                    
-                    if livy_sessions and 'value' in livy_sessions and livy_sessions['value']:
-                        # Extract session information
-                        session_info = self.connector.extract_session_info(livy_sessions)
-                        
-                        if session_info:
+
+            # Each notebook is an independent chain of REST calls, so the
+            # loop is latency-bound; a bounded worker pool overlaps the
+            # round-trips while the cap keeps the Fabric API happy.
+            # Threads, not processes: the work releases the GIL in socket
+            # waits anyway, and threads share one token cache, one pooled
+            # requests.Session, and the single consolidated-file writer,
+            # where per-process workers would each re-authenticate and
+            # need results marshalled back for serial writing
+            pbar = (tqdm(total=total_notebooks, desc="Notebooks", unit="nb")
+                    if tqdm is not None else None)
+            try:
+                with ThreadPoolExecutor(
+                        max_workers=min(self.NOTEBOOK_WORKERS, total_notebooks)) as executor:
+                    futures = [
+                        executor.submit(self._process_notebook, notebook, idx,
+                                        total_notebooks, workspace_name)
+                        for idx, notebook in enumerate(notebook_list)
+                    ]
+                    for future in as_completed(futures):
+                        sessions_processed, had_sessions = future.result()
+                        total_sessions_processed += sessions_processed
+                        if had_sessions:
                             notebooks_with_sessions += 1
-                            print_info(f"Found {highlight(str(len(session_info)))} sessions for this notebook")
-                            
-                            # Download logs for each session
-                            for i, session in enumerate(session_info):
-                                print(f"\n{Colors.BRIGHT_BLUE}{Emoji.PROCESS} Processing session {i+1}/{len(session_info)}{Colors.RESET}")
-                                print(f"{Colors.CYAN}App ID:{Colors.RESET} {highlight(session['sparkApplicationId'])}")
-                                print(f"{Colors.CYAN}Livy ID:{Colors.RESET} {highlight(session['livyId'])}")
-                                print(f"{Colors.CYAN}State:{Colors.RESET} {highlight(session['state'])}")
-                                
-                                # Download logs to temp directory
-                                result = self.connector.download_logs_to_temp(
-                                    notebook_id, 
-                                    session['sparkApplicationId'], 
-                                    session['livyId'],
-                                    notebook_name=notebook_name,
-                                    workspace_name=workspace_name
-                                )
-                                
-                                if result:
-                                    total_sessions_processed += 1
-                                    print_success(f"Logs downloaded successfully!")
-                                    print(f"  {Colors.BRIGHT_GREEN}Directory:{Colors.RESET} {result['temp_directory']}")
-                                    print(f"  {Colors.BRIGHT_GREEN}Files:{Colors.RESET} {highlight(str(len(result['downloaded_files'])))} files")
-                                else:
-                                    print_error(f"Failed to download logs for this session")
-                        else:
-                            print_info(f"No active sessions found with sparkApplicationId and livyId")
-                    else:
-                        print_info(f"No Livy sessions found for this notebook")
-                        
-                except Exception as e:
-                    print_error(f"Error processing notebook {notebook_name}: {e}")
-                    continue
-            
+                        if pbar is not None:
+                            pbar.update(1)
+            finally:
+                if pbar is not None:
+                    pbar.close()
+
             # Finalize the consolidated file with final statistics
             consolidated_file_path = self.connector.finalize_consolidated_file(
-                total_notebooks=len(notebooks['value']),
+                total_notebooks=total_notebooks,
                 notebooks_with_sessions=notebooks_with_sessions,
                 workspace_name=workspace_name
             )
             
             # Summary
             print_header(f"{Emoji.CHART} SUMMARY", 60)
-            print(f"📚 Total notebooks processed: {len(notebooks['value'])}")
+            print(f"📚 Total notebooks processed: {total_notebooks}")
             print(f"* Notebooks with active sessions: {notebooks_with_sessions}")
             print(f"* Total sessions processed: {total_sessions_processed}")
             if consolidated_file_path:
@@ -130,6 +135,85 @@ class SparkLogExtractor:
             print("❌ No notebooks found in workspace")
             return None
 
+    def _process_notebook(self, notebook, notebook_idx, total_notebooks, workspace_name):
+        """
+        Process one notebook end to end; returns (sessions_processed,
+        had_sessions). Runs on a worker thread, so failures are contained
+        here rather than aborting the pool.
+        """
+        notebook_id = notebook['id']
+        notebook_name = notebook['displayName']
+
+        if tqdm is None:
+            print_subheader(f"{Emoji.PROCESS} Processing notebook {notebook_idx + 1}/{total_notebooks}", 60)
+        _detail(f"  {Colors.BRIGHT_CYAN}Name:{Colors.RESET} {highlight(notebook_name)}")
+        _detail(f"  {Colors.BRIGHT_CYAN}ID:{Colors.RESET} {Colors.BRIGHT_WHITE}{notebook_id}{Colors.RESET}")
+
+        sessions_processed = 0
+        had_sessions = False
+
+        try:
+            # Get Livy sessions for this notebook
+            livy_sessions = self.connector.get_livy_sessions(notebook_id)
+
+            if livy_sessions and 'value' in livy_sessions and livy_sessions['value']:
+                # Extract session information
+                session_info = self.connector.extract_session_info(livy_sessions)
+
+                if session_info:
+                    had_sessions = True
+                    print_info(f"Found {highlight(str(len(session_info)))} sessions for this notebook")
+
+                    # Download logs for each session
+                    total_sessions = len(session_info)
+                    for i, session in enumerate(session_info):
+                        app_id = session['sparkApplicationId']
+                        livy_id = session['livyId']
+
+                        # Terminal sessions downloaded by a previous run
+                        # can't change; re-append their cached summary so
+                        # this run's consolidated file still covers them,
+                        # then skip the whole round-trip
+                        if self.connector.is_session_processed(
+                                livy_id, app_id, state=session['state']):
+                            if self.connector.resume_processed_session(notebook_id, livy_id):
+                                print_info(f"Session {livy_id} already processed - skipping")
+                                continue
+                            # Index entry without its cached summary (log
+                            # directory cleaned between runs); re-download
+
+                        _detail(f"\n{Colors.BRIGHT_BLUE}{Emoji.PROCESS} Processing session {i+1}/{total_sessions}{Colors.RESET}")
+                        _detail(f"{Colors.CYAN}App ID:{Colors.RESET} {highlight(app_id)}")
+                        _detail(f"{Colors.CYAN}Livy ID:{Colors.RESET} {highlight(livy_id)}")
+                        _detail(f"{Colors.CYAN}State:{Colors.RESET} {highlight(session['state'])}")
+
+                        # Download logs to temp directory
+                        result = self.connector.download_logs_to_temp(
+                            notebook_id,
+                            app_id,
+                            livy_id,
+                            notebook_name=notebook_name,
+                            workspace_name=workspace_name
+                        )
+
+                        if result:
+                            sessions_processed += 1
+                            self.connector.mark_session_processed(livy_id, app_id)
+                            print_success(f"Logs downloaded successfully!")
+                            print(f"  {Colors.BRIGHT_GREEN}Directory:{Colors.RESET} {result['temp_directory']}")
+                            print(f"  {Colors.BRIGHT_GREEN}Files:{Colors.RESET} {highlight(str(len(result['downloaded_files'])))} files")
+                        else:
+                            print_error(f"Failed to download logs for this session")
+                else:
+                    print_info(f"No active sessions found with sparkApplicationId and livyId")
+            else:
+                print_info(f"No Livy sessions found for this notebook")
+
+        except Exception as e:
+            print_error(f"Error processing notebook {notebook_name}: {e}")
+
+        return sessions_processed, had_sessions
+
 
 def main():
     """Original main function for backwards compatibility"""
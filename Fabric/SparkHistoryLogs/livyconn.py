@@ -4,24 +4,114 @@
 # sys.path.insert(0, src_path)
 ################################################################
 
+import sys
 import time
+import queue
+import logging
+from logging.handlers import QueueHandler, QueueListener
+import threading
 from datetime import datetime,timedelta
 from dateutil.parser import isoparse  
 import requests
+from requests.adapters import HTTPAdapter, Retry
 import os
 import json
-import tempfile
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
 from azure.identity import ClientSecretCredential, InteractiveBrowserCredential,AzureCliCredential
 from fabric_auth import FabricAuthenticator
 
+# Optional: aiohttp downloads a session's three logs (livy, stdout,
+# stderr) concurrently, so each session costs one max round-trip instead
+# of three in sequence. Without it the requests path is used.
+try:
+    import asyncio
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+# Optional: zstd compresses log bodies as they stream to disk. Driver
+# logs are highly compressible text (typically 3-5x at level 3), so this
+# cuts the output footprint proportionally. analyzeLogs.py decompresses
+# .zst files transparently with the same optional dependency.
+try:
+    import zstandard as zstd
+except ImportError:
+    zstd = None
+
+# Optional: orjson (de)serializes the session summaries 3-10x faster than
+# stdlib json; both backends emit the same documents.
+try:
+    import orjson
+
+    def _json_dumps(obj) -> str:
+        return orjson.dumps(obj).decode()
+
+    def _json_dumps_indented(obj) -> str:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode()
+
+    _json_loads = orjson.loads
+except ImportError:
+    def _json_dumps(obj) -> str:
+        return json.dumps(obj)
+
+    def _json_dumps_indented(obj) -> str:
+        return json.dumps(obj, indent=2)
+
+    _json_loads = json.loads
+
+# Connector chatter goes through a queue-backed logger: workers enqueue
+# records (cheap, non-blocking) and a single listener thread does the
+# console I/O, so per-request prints no longer serialize the hot path.
+# Per-request detail sits at DEBUG; %-style args defer string building
+# when the level is off.
+logger = logging.getLogger("fabric.livy")
+if not logger.handlers:
+    _log_queue = queue.SimpleQueue()
+    logger.addHandler(QueueHandler(_log_queue))
+    _log_listener = QueueListener(_log_queue, logging.StreamHandler(sys.stdout))
+    _log_listener.start()
+    logger.setLevel(logging.INFO)
+
+
 class LivyAPIConnector:
     """Livy API connector with flexible authentication"""
-    
+
+    # Endpoint templates built once at class definition; _build_url fills
+    # them with a single .format call instead of rebuilding a dict of
+    # f-strings per request
+    _API_ROOT = "https://api.fabric.microsoft.com/v1/workspaces/{ws}"
+    _URL_TEMPLATES = {
+        "items": _API_ROOT + "/items?type={item_type}",
+        "notebook_id": _API_ROOT + "/notebooks/{item_id}",
+        "instances": _API_ROOT + "/notebooks/{item_id}/jobs/instances",
+        "livySessions": _API_ROOT + "/notebooks/{item_id}/livySessions",
+    }
+    _LOGS_TEMPLATE = (_API_ROOT + "/notebooks/{item_id}/livySessions/{livy_id}"
+                      "/applications/{app_id}/logs")
+
+    # Livy states whose logs can no longer change; only these are safe to
+    # skip on re-runs
+    TERMINAL_STATES = frozenset({'dead', 'success', 'error', 'killed'})
+
     def __init__(self, workspace_id=None, auth_method="auto"):
         self.workspace_id = workspace_id
         self.authenticator = FabricAuthenticator()
         self.auth_method = auth_method
+
+        # One pooled keep-alive session for every Fabric API call; a fresh
+        # TCP+TLS handshake per request would otherwise dominate the many
+        # small calls this connector makes. Throttling (429) and transient
+        # gateway errors retry with exponential backoff, honoring the
+        # Retry-After header Fabric sends when rate-limiting; only GETs
+        # are retried since that's all this connector issues.
+        self.session = requests.Session()
+        retry = Retry(total=5, backoff_factor=0.5,
+                      status_forcelist=[429, 500, 502, 503, 504],
+                      allowed_methods=frozenset({"GET"}),
+                      respect_retry_after_header=True)
+        self.session.mount("https://", HTTPAdapter(pool_connections=32, pool_maxsize=64,
+                                                   max_retries=retry))
         
         # Create output directory if it doesn't exist
         import os
@@ -29,13 +119,55 @@ class LivyAPIConnector:
         os.makedirs(self.output_dir, exist_ok=True)
         
         # Set consolidated file path in output directory
-        filename = f"consolidated_spark_logs_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+        # The workspace goes into the name after the timestamp: parallel
+        # per-workspace workers start within the same second, and a
+        # purely timestamped name would make them share one file (and
+        # one sidecar). Timestamp-first keeps "max basename" meaning
+        # "most recent" for the analyzer's auto-detect.
+        ws_part = f"_{self.workspace_id[:8]}" if self.workspace_id else ""
+        filename = f"consolidated_spark_logs_{datetime.now().strftime('%Y%m%d_%H%M%S')}{ws_part}.json"
         self.consolidated_file = os.path.join(self.output_dir, filename)
         self.consolidated_metadata = None
+
+        # Summaries are appended one JSON line at a time to this sidecar;
+        # finalize_consolidated_file wraps them into the .json envelope in
+        # a single pass. Rewriting the whole envelope per session was
+        # O(sessions^2) bytes of read+parse+write.
+        self._summaries_file = self.consolidated_file + 'l'
+        self._summaries_fh = None
+        self._sessions_written = 0
+        self._consolidation_started = None
+
+        # Serializes consolidated-file appends when sessions are processed
+        # from concurrent notebook workers
+        self._consolidated_lock = threading.Lock()
+
+        # Persistent index of already-downloaded sessions so re-runs only
+        # pay for new sessions; one "livy_id\tapp_id" line per session
+        self._processed_index_file = os.path.join(self.output_dir, '.processed_sessions.txt')
+        self._processed_sessions = self._load_processed_index()
         
+        # Headers dict reused across requests until the token nears expiry
+        self._cached_headers = None
+
+        # Shared pool for the per-session log fetches on the requests
+        # path; the session above is thread-safe, so the three downloads
+        # can overlap their round-trips
+        self._log_executor = ThreadPoolExecutor(max_workers=min(32, 4 * (os.cpu_count() or 1)))
+
+        # Reusable copy buffers for _copy_raw; LIFO keeps the hottest
+        # (cache-warm) buffer on top, and the pool grows only to the peak
+        # number of concurrent fetches
+        self._buf_pool = queue.LifoQueue()
+
+        # Optional hook invoked with each session summary as it is
+        # appended; the security pipeline uses it to start analyzing a
+        # session while later ones are still downloading
+        self.session_callback = None
+
         # Initialize authentication
         self._authenticate()
-    
+
     def _authenticate(self):
         """Initialize authentication based on specified method"""
         try:
@@ -45,32 +177,86 @@ class LivyAPIConnector:
                 self.authenticator.authenticate_interactive()
             elif self.auth_method == "cli":
                 self.authenticator.authenticate_azure_cli()
-                
+
+            # Any re-authentication invalidates the cached headers
+            self._cached_headers = None
+
         except Exception as e:
-            print(f"❌ Authentication failed: {e}")
-            print("💡 Try a different authentication method or check your credentials")
+            logger.error("❌ Authentication failed: %s", e)
+            logger.error("💡 Try a different authentication method or check your credentials")
             raise
-    
+
+    def _load_processed_index(self):
+        """Read the processed-sessions index; empty set when absent"""
+        try:
+            with open(self._processed_index_file, 'r') as f:
+                return {tuple(line.rstrip('\n').split('\t', 1)) for line in f if line.strip()}
+        except FileNotFoundError:
+            return set()
+
+    def is_session_processed(self, livy_id, spark_app_id, state=None):
+        """True when this session's logs were saved by a previous run.
+
+        Only sessions in a terminal state are skipped - logs of running
+        sessions can still grow.
+        """
+        if state is not None and state not in self.TERMINAL_STATES:
+            return False
+        return (livy_id, spark_app_id) in self._processed_sessions
+
+    def resume_processed_session(self, notebook_id, livy_id, workspace_id=None):
+        """Re-append a previously downloaded session's cached summary.
+
+        Sessions skipped via the processed index still belong in the
+        current run's consolidated file (and the pipeline's overlap
+        callback); otherwise a fully cached re-run would write no
+        sessions at all and finalize would report failure. Returns False
+        when the cached summary is missing - the caller should fall back
+        to a full download.
+        """
+        workspace_id = workspace_id or self.workspace_id
+        summary_path = (Path(self.output_dir) / "logs" / workspace_id /
+                        notebook_id / livy_id / "log_summary.json")
+        try:
+            summary = _json_loads(summary_path.read_text())
+        except (FileNotFoundError, ValueError):
+            return False
+        self.append_to_consolidated_file(summary)
+        return True
+
+    def mark_session_processed(self, livy_id, spark_app_id):
+        """Record a successful download in the persistent index"""
+        key = (livy_id, spark_app_id)
+        with self._consolidated_lock:
+            if key in self._processed_sessions:
+                return
+            self._processed_sessions.add(key)
+            with open(self._processed_index_file, 'a') as f:
+                f.write(f"{livy_id}\t{spark_app_id}\n")
+
     def get_headers(self):
-        """Get HTTP headers with authorization"""
-        return self.authenticator.get_headers()
+        """Get HTTP headers with authorization (cached until near token expiry)"""
+        # Every request funnels through here; skipping the authenticator
+        # round-trip (MSAL cache probes, dict rebuild) while the token is
+        # fresh makes this a plain attribute read on the hot path
+        if (self._cached_headers is not None and
+                time.time() < self.authenticator._expires_at -
+                self.authenticator.TOKEN_REFRESH_MARGIN):
+            return self._cached_headers
+
+        self._cached_headers = self.authenticator.get_headers()
+        return self._cached_headers
     
     def _build_url(self, base_type, workspace_id, item_id=None, job_id=None, 
                    item_type='Notebook', continuation_token=None):
         """Build API URLs for different endpoint types"""
-        
-        base_urls = {
-            "items": f"https://api.fabric.microsoft.com/v1/workspaces/{workspace_id}/items?type={item_type}",
-            "notebook_id": f"https://api.fabric.microsoft.com/v1/workspaces/{workspace_id}/notebooks/{item_id}",
-            "instances": f"https://api.fabric.microsoft.com/v1/workspaces/{workspace_id}/notebooks/{item_id}/jobs/instances",
-            "livySessions": f"https://api.fabric.microsoft.com/v1/workspaces/{workspace_id}/notebooks/{item_id}/livySessions"
-        }
-        
-        if base_type not in base_urls:
+
+        template = self._URL_TEMPLATES.get(base_type)
+        if template is None:
             raise ValueError(f"Unknown base_type: {base_type}")
-        
-        url = base_urls[base_type]
-        
+
+        url = template.format(ws=workspace_id, item_id=item_id, item_type=item_type)
+
         if continuation_token:
             separator = "&" if "?" in url else "?"
             url = f"{url}{separator}continuationToken={continuation_token}"
@@ -84,62 +270,62 @@ class LivyAPIConnector:
         url = self._build_url(base_type, workspace_id, item_id, job_id, 
                              item_type, continuation_token)
         
-        print(f"* Making request to: {url}")
+        logger.debug("Making request to: %s", url)
         
         try:
             headers = self.get_headers()
-            response = requests.get(url, headers=headers, timeout=30)
+            response = self.session.get(url, headers=headers, timeout=30)
             
             # Log response details
-            print(f"  Status: {response.status_code}")
+            logger.debug("  Status: %s", response.status_code)
             
             if response.status_code == 200:
                 return response.json()
             elif response.status_code == 401:
-                print("🔐 Authentication error - token may have expired")
+                logger.warning("🔐 Authentication error - token may have expired")
                 # Try to refresh authentication
                 self._authenticate()
                 headers = self.get_headers()
-                response = requests.get(url, headers=headers, timeout=30)
+                response = self.session.get(url, headers=headers, timeout=30)
                 if response.status_code == 200:
                     return response.json()
             elif response.status_code == 403:
-                print("🚫 Access forbidden - check workspace permissions")
+                logger.warning("🚫 Access forbidden - check workspace permissions")
             elif response.status_code == 404:
-                print("❓ Resource not found - check workspace/item IDs")
+                logger.warning("❓ Resource not found - check workspace/item IDs")
             
-            print(f"❌ Request failed: {response.text}")
+            logger.error("❌ Request failed: %s", response.text)
             response.raise_for_status()
             
         except requests.exceptions.Timeout:
-            print("⏱️ Request timed out")
+            logger.error("⏱️ Request timed out")
             raise
         except requests.exceptions.RequestException as e:
-            print(f"- Network error: {e}")
+            logger.error("- Network error: %s", e)
             raise
         except Exception as e:
-            print(f"❌ Unexpected error: {e}")
+            logger.error("❌ Unexpected error: %s", e)
             raise
 
     def get_workspaces(self):
         """Get all accessible workspaces"""
-        print("* Getting workspaces...")
+        logger.info("* Getting workspaces...")
         url = "https://api.fabric.microsoft.com/v1/workspaces"
         
         try:
             headers = self.get_headers()
-            response = requests.get(url, headers=headers)
+            response = self.session.get(url, headers=headers)
             
             if response.status_code == 200:
                 workspaces = response.json().get('value', [])
-                print(f"+ Found {len(workspaces)} workspaces")
+                logger.info("+ Found %d workspaces", len(workspaces))
                 return workspaces
             else:
-                print(f"❌ Failed to get workspaces: {response.text}")
+                logger.error("❌ Failed to get workspaces: %s", response.text)
                 return []
                 
         except Exception as e:
-            print(f"❌ Error getting workspaces: {e}")
+            logger.error("❌ Error getting workspaces: %s", e)
             return []
         
     def get_notebooks(self, workspace_id=None):
@@ -148,7 +334,7 @@ class LivyAPIConnector:
         if not workspace_id:
             raise ValueError("workspace_id is required")
             
-        print(f"* Getting notebooks from workspace: {workspace_id}")
+        logger.info("* Getting notebooks from workspace: %s", workspace_id)
         return self.make_request("items", workspace_id, item_type="Notebook")
 
     def get_livy_sessions(self, notebook_id, workspace_id=None):
@@ -157,7 +343,7 @@ class LivyAPIConnector:
         if not workspace_id:
             raise ValueError("workspace_id is required")
             
-        print(f"* Getting Livy sessions for notebook: {notebook_id}")
+        logger.debug("Getting Livy sessions for notebook: %s", notebook_id)
         return self.make_request("livySessions", workspace_id, notebook_id)
 
     def extract_session_info(self, livy_sessions):
@@ -174,70 +360,175 @@ class LivyAPIConnector:
                         'name': session.get('name', 'unknown')
                     }
                     session_info.append(info)
-                    print(f"📝 Found session - App ID: {info['sparkApplicationId']}, Livy ID: {info['livyId']}, State: {info['state']}")
+                    logger.info("📝 Found session - App ID: %s, Livy ID: %s, State: %s",
+                                info['sparkApplicationId'], info['livyId'], info['state'])
         
         return session_info
 
+    # Pooled copy-buffer size; livy metadata logs usually fit in one read
+    _COPY_BUF_SIZE = 1 << 20
+
+    def _copy_raw(self, raw, writer):
+        """
+        Copy a response body into writer through a pooled bytearray.
+
+        readinto fills the borrowed buffer in place, so steady-state
+        copying allocates nothing per chunk - shutil.copyfileobj would
+        create a fresh bytes object per read, which adds up when
+        thousands of sessions each produce short livy logs.
+        """
+        try:
+            buf = self._buf_pool.get_nowait()
+        except queue.Empty:
+            buf = bytearray(self._COPY_BUF_SIZE)
+        view = memoryview(buf)
+        try:
+            while True:
+                n = raw.readinto(buf)
+                if not n:
+                    break
+                writer.write(view[:n])
+        finally:
+            self._buf_pool.put_nowait(buf)
+
+    def _log_exists(self, url, headers):
+        """Cheap HEAD probe; False only when the endpoint reports 404"""
+        try:
+            # Only a definite miss skips the download. Endpoints that
+            # answer HEAD with 405/403/redirects would otherwise look
+            # like misses and silently drop every log.
+            return self.session.head(url, headers=headers, timeout=5).status_code != 404
+        except requests.exceptions.RequestException:
+            return True  # Probe inconclusive; let the GET decide
+
+    def _fetch_log(self, headers, label, url, dest):
+        """
+        Download one log file; returns (dest, success).
+
+        headers is a required parameter on purpose: callers capture
+        self.get_headers() once per session and pass the same dict to
+        every fetch, so the authenticator is touched once per token-TTL
+        window rather than once per request.
+        """
+        logger.debug("Downloading %s logs...", label)
+        # Stream to disk: driver logs can run to hundreds of MB, and
+        # .content would hold the whole body in memory before the write
+        with self.session.get(url, headers=headers, timeout=60, stream=True) as response:
+            if response.status_code == 200:
+                response.raw.decode_content = True
+                if zstd is not None:
+                    dest = Path(f"{dest}.zst")
+                    cctx = zstd.ZstdCompressor(level=3, threads=-1)
+                    with open(dest, 'wb') as f, cctx.stream_writer(f) as writer:
+                        self._copy_raw(response.raw, writer)
+                else:
+                    with open(dest, 'wb') as f:
+                        self._copy_raw(response.raw, f)
+                logger.info("+ %s logs saved: %s", label, dest)
+                return dest, True
+
+            logger.error("❌ Failed to download %s logs: %s", label, response.status_code)
+            return dest, False
+
+    async def _download_logs_async(self, headers, log_specs):
+        """Fetch all of a session's log files concurrently with aiohttp"""
+        connector = aiohttp.TCPConnector(limit_per_host=64)
+        timeout = aiohttp.ClientTimeout(total=60)
+        async with aiohttp.ClientSession(connector=connector, headers=headers,
+                                         timeout=timeout) as session:
+
+            async def fetch(label, url, dest):
+                logger.debug("Downloading %s logs...", label)
+                try:
+                    async with session.get(url) as response:
+                        if response.status == 200:
+                            # Chunked copy keeps peak memory at one chunk
+                            # even for very large driver logs
+                            if zstd is not None:
+                                dest = Path(f"{dest}.zst")
+                                cctx = zstd.ZstdCompressor(level=3, threads=-1)
+                                with open(dest, 'wb') as f, cctx.stream_writer(f) as writer:
+                                    async for chunk in response.content.iter_chunked(1 << 16):
+                                        writer.write(chunk)
+                            else:
+                                with open(dest, 'wb') as f:
+                                    async for chunk in response.content.iter_chunked(1 << 16):
+                                        f.write(chunk)
+                            logger.info("+ %s logs saved: %s", label, dest)
+                            return dest, True
+                        logger.error("❌ Failed to download %s logs: %s", label, response.status)
+                except Exception as e:
+                    logger.error("❌ Error downloading %s logs: %s", label, e)
+                return dest, False
+
+            return await asyncio.gather(*(fetch(*spec) for spec in log_specs))
+
     def download_logs_to_temp(self, notebook_id, spark_app_id, livy_id, notebook_name=None, workspace_name=None, workspace_id=None):
         """Download Livy, stdout, and stderr logs to a temporary directory"""
         workspace_id = workspace_id or self.workspace_id
         if not workspace_id:
             raise ValueError("workspace_id is required")
         
-        # Create temporary directory
-        temp_dir = tempfile.mkdtemp(prefix=f"spark_logs_{livy_id}_")
-        temp_path = Path(temp_dir)
-        
-        print(f"+ Created temp directory: {temp_dir}")
-        
+        # Deterministic shard under output/ instead of a randomized
+        # mkdtemp: re-runs land on the same path, so prior downloads are
+        # found and reused instead of duplicated
+        temp_path = Path(self.output_dir) / "logs" / workspace_id / notebook_id / livy_id
+        temp_path.mkdir(parents=True, exist_ok=True)
+        temp_dir = str(temp_path)
+
+        existing_summary = temp_path / "log_summary.json"
+        if existing_summary.exists():
+            logger.info("+ Logs already present, reusing: %s", temp_dir)
+            summary = _json_loads(existing_summary.read_text())
+            # Resumed sessions still belong in this run's consolidated
+            # file (and the pipeline's overlap callback); skipping the
+            # append would make a re-run's report silently cover fewer
+            # sessions than it processed
+            self.append_to_consolidated_file(summary)
+            return {
+                "temp_directory": temp_dir,
+                "downloaded_files": summary.get("downloaded_files", []),
+                "summary_file": str(existing_summary)
+            }
+
+        logger.debug("Created log directory: %s", temp_dir)
+
+        # Captured once per session and threaded through the probes and
+        # fetch helpers below; don't reintroduce per-request get_headers()
+        # calls here
         headers = self.get_headers()
-        base_url = f"https://api.fabric.microsoft.com/v1/workspaces/{workspace_id}/notebooks/{notebook_id}/livySessions/{livy_id}/applications/{spark_app_id}/logs"
-        
-        logs_downloaded = []
+        base_url = self._LOGS_TEMPLATE.format(ws=workspace_id, item_id=notebook_id,
+                                              livy_id=livy_id, app_id=spark_app_id)
         
+        # (label, url, destination) for the three per-session log files
+        log_specs = [
+            ("Livy", f"{base_url}?type=livy&isDownload=true", temp_path / "livy_logs.txt"),
+            ("Stdout", f"{base_url}?type=driver&fileName=stdout", temp_path / "driver_stdout.log"),
+            ("Stderr", f"{base_url}?type=driver&fileName=stderr", temp_path / "driver_stderr.log"),
+        ]
+
+        # Concurrent HEAD probes drop endpoints that 404 - common for
+        # sessions whose driver logs never started or have expired - so no
+        # full GET (with its 60s timeout budget) is spent on a miss
+        probes = list(self._log_executor.map(
+            lambda spec: self._log_exists(spec[1], headers), log_specs))
+        for (label, _, _), available in zip(log_specs, probes):
+            if not available:
+                logger.info("- %s logs not available; skipping download", label)
+        log_specs = [spec for spec, available in zip(log_specs, probes) if available]
+
         try:
-            # 1. Download Livy logs
-            print("* Downloading Livy logs...")
-            livy_url = f"{base_url}?type=livy&isDownload=true"
-            livy_response = requests.get(livy_url, headers=headers, timeout=60)
-            
-            if livy_response.status_code == 200:
-                livy_file = temp_path / "livy_logs.txt"
-                with open(livy_file, 'wb') as f:
-                    f.write(livy_response.content)
-                logs_downloaded.append(str(livy_file))
-                print(f"+ Livy logs saved: {livy_file}")
-            else:
-                print(f"❌ Failed to download Livy logs: {livy_response.status_code}")
-            
-            # 2. Download stdout logs
-            print("* Downloading stdout logs...")
-            stdout_url = f"{base_url}?type=driver&fileName=stdout"
-            stdout_response = requests.get(stdout_url, headers=headers, timeout=60)
-            
-            if stdout_response.status_code == 200:
-                stdout_file = temp_path / "driver_stdout.log"
-                with open(stdout_file, 'wb') as f:
-                    f.write(stdout_response.content)
-                logs_downloaded.append(str(stdout_file))
-                print(f"+ Stdout logs saved: {stdout_file}")
-            else:
-                print(f"❌ Failed to download stdout logs: {stdout_response.status_code}")
-            
-            # 3. Download stderr logs
-            print("* Downloading stderr logs...")
-            stderr_url = f"{base_url}?type=driver&fileName=stderr"
-            stderr_response = requests.get(stderr_url, headers=headers, timeout=60)
-            
-            if stderr_response.status_code == 200:
-                stderr_file = temp_path / "driver_stderr.log"
-                with open(stderr_file, 'wb') as f:
-                    f.write(stderr_response.content)
-                logs_downloaded.append(str(stderr_file))
-                print(f"+ Stderr logs saved: {stderr_file}")
+            if aiohttp is not None:
+                results = asyncio.run(self._download_logs_async(headers, log_specs))
             else:
-                print(f"❌ Failed to download stderr logs: {stderr_response.status_code}")
-            
+                # Fetch the three logs concurrently; collecting results in
+                # submit order keeps logs_downloaded stable
+                futures = [self._log_executor.submit(self._fetch_log, headers, label, url, dest)
+                           for label, url, dest in log_specs]
+                results = [future.result() for future in futures]
+
+            logs_downloaded = [str(dest) for dest, ok in results if ok]
+
             # Create a summary file
             summary_file = temp_path / "log_summary.json"
             summary = {
@@ -254,10 +545,10 @@ class LivyAPIConnector:
             }
             
             with open(summary_file, 'w') as f:
-                json.dump(summary, f, indent=2)
+                f.write(_json_dumps_indented(summary))
             
-            print(f"+ Log summary saved: {summary_file}")
-            print(f"+ All logs saved to: {temp_dir}")
+            logger.debug("Log summary saved: %s", summary_file)
+            logger.info("+ All logs saved to: %s", temp_dir)
             
             # Append to consolidated file
             self.append_to_consolidated_file(summary)
@@ -269,66 +560,75 @@ class LivyAPIConnector:
             }
             
         except Exception as e:
-            print(f"❌ Error downloading logs: {e}")
+            logger.error("❌ Error downloading logs: %s", e)
             return None
     
     def append_to_consolidated_file(self, log_summary):
-        """Append a log summary to the consolidated file"""
+        """Append a log summary to the consolidated file (thread-safe)"""
         try:
-            # Read current file
-            if os.path.exists(self.consolidated_file):
-                with open(self.consolidated_file, 'r') as f:
-                    data = json.load(f)
-            else:
-                # If file doesn't exist, create initial structure
-                data = self.consolidated_metadata or {
-                    "metadata": {
-                        "workspace_id": self.workspace_id,
-                        "workspace_name": "unknown",
-                        "consolidation_started": datetime.now().isoformat(),
-                        "total_sessions_processed": 0
-                    },
-                    "log_summaries": []
-                }
-            
-            # Append new summary
-            data["log_summaries"].append(log_summary)
-            data["metadata"]["total_sessions_processed"] = len(data["log_summaries"])
-            data["metadata"]["last_updated"] = datetime.now().isoformat()
-            
-            # Write back to file
-            with open(self.consolidated_file, 'w') as f:
-                json.dump(data, f, indent=2)
-            
-            print(f"+ Appended session to consolidated file ({len(data['log_summaries'])} total)")
-            
+            with self._consolidated_lock:
+                self._append_locked(log_summary)
         except Exception as e:
-            print(f"❌ Failed to append to consolidated file: {e}")
+            logger.error("❌ Failed to append to consolidated file: %s", e)
+
+        # Notify outside the lock so a slow consumer can't stall appends
+        if self.session_callback is not None:
+            self.session_callback(log_summary)
+
+    def _append_locked(self, log_summary):
+        """Perform the consolidated-file append under the lock"""
+        # The cached handle doubles as the initialized flag: after the
+        # first append there is no per-session existence check or open
+        if self._summaries_fh is None:
+            self._summaries_fh = open(self._summaries_file, 'a', buffering=1024 * 1024)
+            self._consolidation_started = datetime.now().isoformat()
+
+        # One JSON line per session; no re-read or rewrite of prior work
+        self._summaries_fh.write(_json_dumps(log_summary) + "\n")
+        self._sessions_written += 1
+
+        logger.info("+ Appended session to consolidated file (%d total)", self._sessions_written)
     
     def finalize_consolidated_file(self, total_notebooks=0, notebooks_with_sessions=0, workspace_name=None):
-        """Finalize the consolidated file with final statistics"""
+        """Wrap the appended session lines into the final consolidated file"""
         try:
-            if os.path.exists(self.consolidated_file):
-                with open(self.consolidated_file, 'r') as f:
-                    data = json.load(f)
-                
-                data["metadata"].update({
+            with self._consolidated_lock:
+                if self._summaries_fh is not None:
+                    self._summaries_fh.close()
+                    self._summaries_fh = None
+
+                if not os.path.exists(self._summaries_file):
+                    return None
+
+                # Single pass: read the JSONL sidecar and emit the envelope
+                with open(self._summaries_file, 'r') as f:
+                    log_summaries = [_json_loads(line) for line in f if line.strip()]
+
+                metadata = (self.consolidated_metadata or {}).get("metadata") or {
+                    "workspace_id": self.workspace_id,
+                    "workspace_name": "unknown",
+                    "consolidation_started": self._consolidation_started,
+                }
+                metadata.update({
+                    "total_sessions_processed": len(log_summaries),
                     "total_notebooks_processed": total_notebooks,
                     "notebooks_with_sessions": notebooks_with_sessions,
                     "consolidation_completed": datetime.now().isoformat()
                 })
-                
+
                 # Update workspace_name if provided
                 if workspace_name:
-                    data["metadata"]["workspace_name"] = workspace_name
-                
+                    metadata["workspace_name"] = workspace_name
+
                 with open(self.consolidated_file, 'w') as f:
-                    json.dump(data, f, indent=2)
-                
-                print(f"+ Finalized consolidated file: {self.consolidated_file}")
-                print(f"+ Final stats: {len(data['log_summaries'])} sessions from {notebooks_with_sessions} notebooks")
+                    f.write(_json_dumps_indented(
+                        {"metadata": metadata, "log_summaries": log_summaries}))
+                os.remove(self._summaries_file)
+
+                logger.info("+ Finalized consolidated file: %s", self.consolidated_file)
+                logger.info("+ Final stats: %d sessions from %d notebooks", len(log_summaries), notebooks_with_sessions)
                 return self.consolidated_file
         except Exception as e:
-            print(f"❌ Failed to finalize consolidated file: {e}")
-        
+            logger.error("❌ Failed to finalize consolidated file: %s", e)
+
         return None
\ No newline at end of file
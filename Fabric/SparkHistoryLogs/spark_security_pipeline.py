@@ -2,7 +2,8 @@
 """
 Spark Security Pipeline - Combined Log Extraction and Security Analysis
 
-This script calls getLivy.py to extract logs and then analyzeLogs.py to analyze them.
+This script drives getLivy.py extraction and analyzeLogs.py analysis
+in-process, scanning each session's logs while later ones download.
 
 Usage:
     python spark_security_pipeline.py --workspace-id <workspace_id> --auth-method <method>
@@ -12,38 +13,82 @@ Example:
 """
 
 import argparse
+import logging
+import re
 import sys
 import os
-import subprocess
+import threading
+from queue import Queue
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from datetime import datetime
 from pathlib import Path
-import glob
 from console_utils import *
+from analyzeLogs import SparkLogAnalyzer, analyze as run_analysis
 
+# Imported once at module scope so multi-workspace loops don't re-run
+# the import machinery per call and a broken environment fails at
+# startup instead of mid-run; getLivy pulls in the azure-identity stack,
+# so analysis-only use keeps working without it
+try:
+    from getLivy import SparkLogExtractor
+except ImportError:
+    SparkLogExtractor = None
 
-def extract_logs_for_workspace(workspace_id: str, auth_method: str = "cli") -> str:
+logger = logging.getLogger(__name__)
+
+# Sentinel closing the extraction->analysis queue
+_EXTRACTION_DONE = object()
+
+# Workspace IDs are UUIDs; compiled once so validation is a single
+# C-level pass that also checks the hex digits, not just length/dashes
+_WORKSPACE_ID_RE = re.compile(r'\A[0-9a-fA-F]{8}-([0-9a-fA-F]{4}-){3}[0-9a-fA-F]{12}\Z')
+
+# Tracks whether output/ has been created this process, so loops over
+# many consolidated files don't re-issue the mkdir syscall per call
+_output_ready = False
+
+
+def _ensure_output_dir():
+    """Create output/ on first use; later calls are a boolean check"""
+    global _output_ready
+    if not _output_ready:
+        Path("output").mkdir(exist_ok=True)
+        _output_ready = True
+
+
+def extract_logs_for_workspace(workspace_id: str, auth_method: str = "cli",
+                               session_callback=None) -> str:
     """
     Extract logs using the getLivy.py SparkLogExtractor class
-    
+
+    Args:
+        session_callback: optional callable invoked with each session
+            summary as its logs finish downloading; run_complete_pipeline
+            uses this to feed the analyzer while extraction continues
+
     Returns:
         str: Path to the consolidated JSON file
     """
     print_header(f"{Emoji.FOLDER} PHASE 1: LOG EXTRACTION", 70)
-    
+
+    if SparkLogExtractor is None:
+        print_error("getLivy could not be imported (azure-identity stack missing); cannot extract logs")
+        return None
+
     try:
-        from getLivy import SparkLogExtractor
-        
         print_process(f"Starting log extraction...")
         print(f"  {Colors.BRIGHT_CYAN}▶{Colors.RESET} Workspace ID: {highlight(workspace_id)}")
         print(f"  {Colors.BRIGHT_CYAN}▶{Colors.RESET} Auth method: {highlight(auth_method)}")
-        
+
         # Use the SparkLogExtractor class
         extractor = SparkLogExtractor(workspace_id, auth_method)
+        if session_callback is not None:
+            extractor.connector.session_callback = session_callback
         consolidated_file_path = extractor.extract_all_logs()
         
         if consolidated_file_path:
             print_success(f"Log extraction completed!")
-            print(f"  {Colors.BRIGHT_GREEN}▶{Colors.RESET} Consolidated file: {highlight(os.path.basename(consolidated_file_path))}")
+            print(f"  {Colors.BRIGHT_GREEN}▶{Colors.RESET} Consolidated file: {highlight(Path(consolidated_file_path).name)}")
             return consolidated_file_path
         else:
             print_error(f"Log extraction failed - no consolidated file created")
@@ -51,81 +96,75 @@ def extract_logs_for_workspace(workspace_id: str, auth_method: str = "cli") -> s
                 
     except Exception as e:
         print_error(f"Log extraction failed: {e}")
-        import traceback
-        traceback.print_exc()
+        # Frame walking and formatting only happen when --debug is on;
+        # Azure SDK tracebacks are deep and expensive to render
+        logger.debug("Log extraction failed", exc_info=True)
         return None
 
 
-def analyze_logs_from_file(consolidated_file_path: str, external_only: bool = False, export_summary: str = None) -> bool:
+def analyze_logs_from_file(consolidated_file_path: str, external_only: bool = False,
+                           export_summary: str = None, run_ts: str = None) -> bool:
     """
-    Analyze logs using analyzeLogs.py via subprocess
-    
+    Analyze logs by calling analyzeLogs.analyze in-process
+
+    A subprocess here paid interpreter startup and a duplicate import of
+    every analyzer module per invocation, and capture_output buffered all
+    analysis output until the child exited; the direct call skips both
+    and streams output live.
+
     Args:
         consolidated_file_path: Path to consolidated JSON file
-        
+
     Returns:
         bool: True if analysis completed successfully
     """
     print_header(f"{Emoji.SHIELD} PHASE 2: SECURITY ANALYSIS", 70)
-    
-    if not consolidated_file_path or not os.path.exists(consolidated_file_path):
+
+    # One Path object instead of re-parsing the string per os.path call
+    consolidated_path = Path(consolidated_file_path) if consolidated_file_path else None
+    if consolidated_path is None or not consolidated_path.exists():
         print_error("No consolidated file available for analysis")
         return False
-    
+
     try:
-        print_process(f"Running security analysis on: {highlight(os.path.basename(consolidated_file_path))}")
-        
-        # Generate timestamp for reports
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        
+        print_process(f"Running security analysis on: {highlight(consolidated_path.name)}")
+
+        # One timestamp per run (passed in by main) keeps report names
+        # correlated with the extraction artifacts; a fresh one is only
+        # minted for direct calls
+        timestamp = run_ts or datetime.now().strftime("%Y%m%d_%H%M%S")
+
         # Create output directory if it doesn't exist
-        os.makedirs("output", exist_ok=True)
-        
-        # Prepare command arguments
-        cmd_args = [sys.executable, "analyzeLogs.py", consolidated_file_path]
-        
-        if external_only:
-            cmd_args.append("--external-only")
-            
+        _ensure_output_dir()
+
         if export_summary:
             # If export_summary doesn't include a path, put it in output folder
-            if not os.path.dirname(export_summary):
-                export_summary = os.path.join("output", export_summary)
-            cmd_args.extend(["--export-summary", export_summary])
+            if Path(export_summary).parent == Path('.'):
+                export_summary = str(Path("output") / export_summary)
         elif external_only:
             # Default external report if external-only is specified but no export file given
-            external_report_file = os.path.join("output", f"pipeline_external_report_{timestamp}.txt")
-            cmd_args.extend(["--export-summary", external_report_file])
-        
-        print(f"  > Running analysis with command: {' '.join(cmd_args[2:])}")
-        result = subprocess.run(cmd_args, capture_output=True, text=True, cwd=os.getcwd())
-        
-        
-        if result.returncode == 0:
+            export_summary = str(Path("output") / f"pipeline_external_report_{timestamp}.txt")
+
+        rc = run_analysis(consolidated_file_path, external_only=external_only,
+                          export_summary=export_summary)
+
+        if rc == 0:
             print_success(f"Analysis completed successfully")
             if export_summary:
                 print(f"  {Colors.BRIGHT_GREEN}▶{Colors.RESET} Report exported to: {highlight(export_summary)}")
-            
-            # Show the analysis output
-            if result.stdout:
-                print("\n=== ANALYSIS RESULTS ===")
-                print(result.stdout)
-                
         else:
-            print_error(f"Analysis failed: {result.stderr}")
-            if result.stdout:
-                print("Output:", result.stdout)
-        
-        return result.returncode == 0
-        
+            print_error(f"Analysis failed with exit code {rc}")
+
+        return rc == 0
+
     except Exception as e:
         print(f"- Security analysis failed: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.debug("Security analysis failed", exc_info=True)
         return False
 
 
-def run_complete_pipeline(workspace_id: str, auth_method: str = "cli", external_only: bool = False, export_summary: str = None) -> bool:
+def run_complete_pipeline(workspace_id: str, auth_method: str = "cli", external_only: bool = False,
+                          export_summary: str = None, run_ts: str = None) -> bool:
     """
     Run the complete pipeline: extract logs then analyze them
     
@@ -136,19 +175,70 @@ def run_complete_pipeline(workspace_id: str, auth_method: str = "cli", external_
     print(f"  > Timestamp: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     print(f"  > Workspace ID: {workspace_id}")
     print(f"  > Auth Method: {auth_method}")
-    
-    # Phase 1: Extract logs
-    consolidated_file = extract_logs_for_workspace(workspace_id, auth_method)
+
+    # The two phases overlap: extraction pushes each session summary onto
+    # a queue as its logs land, and a consumer thread scans it while
+    # later sessions are still downloading. End-to-end time approaches
+    # max(extract, analyze) instead of their sum, and the consolidated
+    # file is still written as before for --analyze-only re-runs.
+    analyzer = SparkLogAnalyzer()
+    session_queue = Queue()
+
+    def _consume_sessions():
+        while True:
+            session = session_queue.get()
+            if session is _EXTRACTION_DONE:
+                break
+            try:
+                analyzer.analyze_session(session)
+            except Exception as e:
+                print_error(f"Analysis failed for session "
+                            f"{session.get('livy_id', 'unknown')}: {e}")
+
+    consumer = threading.Thread(target=_consume_sessions,
+                                name="session-analyzer", daemon=True)
+    consumer.start()
+
+    # Phase 1: Extract logs (analysis consumes concurrently)
+    consolidated_file = extract_logs_for_workspace(
+        workspace_id, auth_method, session_callback=session_queue.put)
+    session_queue.put(_EXTRACTION_DONE)
+    consumer.join()
+
     if not consolidated_file:
         print("\n- Pipeline failed at log extraction phase")
         return False
-    
-    # Phase 2: Analyze logs  
-    analysis_success = analyze_logs_from_file(consolidated_file, external_only, export_summary)
-    if not analysis_success:
+
+    # Phase 2: Report on the already-analyzed sessions
+    print_header(f"{Emoji.SHIELD} PHASE 2: SECURITY ANALYSIS", 70)
+    try:
+        if external_only:
+            sessions_with_external = analyzer.get_sessions_with_external_connections()
+            print(f"\n!!! SESSIONS WITH EXTERNAL CONNECTIONS ({len(sessions_with_external)}) !!!")
+            for session in sessions_with_external:
+                print(f"> {session['notebook_name']} (Livy ID: {session['livy_id']})")
+                print(f"   External: {session['total_external_connections']}, "
+                      f"Trusted: {session['total_trusted_connections']}")
+                print(f"   Monitor: {session['app_url']}")
+        else:
+            analyzer.print_comprehensive_summary()
+
+        # Same report defaults as analyze_logs_from_file
+        _ensure_output_dir()
+        if export_summary:
+            if Path(export_summary).parent == Path('.'):
+                export_summary = str(Path("output") / export_summary)
+        elif external_only:
+            timestamp = run_ts or datetime.now().strftime("%Y%m%d_%H%M%S")
+            export_summary = str(Path("output") / f"pipeline_external_report_{timestamp}.txt")
+        if export_summary:
+            analyzer.export_summary_to_text(export_summary)
+            print(f"  {Colors.BRIGHT_GREEN}▶{Colors.RESET} Report exported to: {highlight(export_summary)}")
+    except Exception as e:
+        print_error(f"Security analysis failed: {e}")
         print("\n- Pipeline failed at security analysis phase")
         return False
-    
+
     print("\n" + "="*70)
     print("*** PIPELINE COMPLETED SUCCESSFULLY! ***")
     print("="*70)
@@ -161,6 +251,68 @@ def run_complete_pipeline(workspace_id: str, auth_method: str = "cli", external_
     return True
 
 
+def _per_workspace_report(export_summary: str, workspace_id: str) -> str:
+    """Suffix a report filename so parallel workspaces don't clobber it"""
+    if not export_summary:
+        return None
+    p = Path(export_summary)
+    return str(p.with_name(f"{p.stem}_{workspace_id[:8]}{p.suffix}"))
+
+
+def _run_workspace(workspace_id: str, auth_method: str, external_only: bool,
+                   export_summary: str, run_ts: str = None):
+    """
+    Top-level (picklable) wrapper running one workspace's full pipeline
+    in a worker process; returns (workspace_id, success).
+    """
+    try:
+        # Materialize the default --external-only report name here so it
+        # gets the per-workspace suffix too; with the shared run_ts every
+        # worker would otherwise write the same default path
+        report = export_summary
+        if report is None and external_only:
+            ts = run_ts or datetime.now().strftime("%Y%m%d_%H%M%S")
+            report = f"pipeline_external_report_{ts}.txt"
+        ok = run_complete_pipeline(workspace_id, auth_method, external_only,
+                                   _per_workspace_report(report, workspace_id),
+                                   run_ts=run_ts)
+        return workspace_id, ok
+    except Exception as e:
+        print_error(f"Pipeline failed for workspace {workspace_id}: {e}")
+        return workspace_id, False
+
+
+def run_pipeline_for_workspaces(workspace_ids, auth_method: str = "cli",
+                                external_only: bool = False, export_summary: str = None,
+                                max_parallel: int = 5, run_ts: str = None) -> bool:
+    """
+    Run the full pipeline for several workspaces concurrently.
+
+    Each workspace's REST traffic is independent, so N worker processes
+    scale near-linearly; each worker gets its own token, session pool,
+    and consolidated file. Concurrency is capped to stay under Fabric
+    API throttling limits.
+    """
+    max_workers = min(len(workspace_ids), max_parallel, os.cpu_count() or 1)
+    print(f"*** Running pipeline for {len(workspace_ids)} workspaces "
+          f"({max_workers} in parallel) ***")
+
+    all_ok = True
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(_run_workspace, ws, auth_method,
+                                   external_only, export_summary, run_ts)
+                   for ws in workspace_ids]
+        for future in as_completed(futures):
+            ws, ok = future.result()
+            if ok:
+                print_success(f"Workspace {ws}: pipeline completed")
+            else:
+                print_error(f"Workspace {ws}: pipeline failed")
+                all_ok = False
+
+    return all_ok
+
+
 def main():
     """Main function to handle command line arguments and run the pipeline"""
     parser = argparse.ArgumentParser(
@@ -189,11 +341,26 @@ Examples:
     )
     
     parser.add_argument(
-        '--workspace-id', 
+        '--workspace-id',
         required=True,
         help='Microsoft Fabric workspace ID'
     )
-    
+
+    parser.add_argument(
+        '--workspace-ids',
+        action='append',
+        default=[],
+        metavar='WORKSPACE_ID',
+        help='Additional workspace ID to process in parallel (can be used multiple times)'
+    )
+
+    parser.add_argument(
+        '--max-parallel',
+        type=int,
+        default=5,
+        help='Max workspaces processed concurrently (default: 5, capped to avoid Fabric API throttling)'
+    )
+
     parser.add_argument(
         '--auth-method',
         choices=['cli', 'interactive', 'service_principal'],
@@ -221,19 +388,38 @@ Examples:
         '--export-summary',
         help='Export summary to text file'
     )
+
+    parser.add_argument(
+        '--debug',
+        action='store_true',
+        help='Show full tracebacks on errors'
+    )
     
     args = parser.parse_args()
-    
-    # Validate workspace ID format (basic UUID check)
-    if len(args.workspace_id) != 36 or args.workspace_id.count('-') != 4:
-        print("❌ Invalid workspace ID format. Expected format: xxxxxxxx-xxxx-xxxx-xxxx-xxxxxxxxxxxx")
-        sys.exit(1)
-    
+
+    if args.debug or os.getenv('PIPELINE_DEBUG'):
+        logging.basicConfig(level=logging.DEBUG)
+
+    # Single timestamp for the whole run so every artifact it produces
+    # shares the same suffix
+    run_ts = datetime.now().strftime("%Y%m%d_%H%M%S")
+
+    # First flag wins ordering; extras keep their given order minus dups
+    workspace_ids = [args.workspace_id]
+    workspace_ids += [ws for ws in args.workspace_ids if ws not in workspace_ids]
+
+    # Validate workspace ID format (UUID check)
+    for workspace_id in workspace_ids:
+        if not _WORKSPACE_ID_RE.match(workspace_id):
+            print(f"❌ Invalid workspace ID format: {workspace_id}. Expected format: xxxxxxxx-xxxx-xxxx-xxxx-xxxxxxxxxxxx")
+            sys.exit(1)
+
     try:
         if args.analyze_only:
             # Only run analysis on existing file
             print(f"* Analyzing existing consolidated file: {args.analyze_only}")
-            success = analyze_logs_from_file(args.analyze_only, args.external_only, args.export_summary)
+            success = analyze_logs_from_file(args.analyze_only, args.external_only,
+                                             args.export_summary, run_ts=run_ts)
         elif args.extract_only:
             # Only extract logs
             print(f"* Extracting logs only for workspace: {args.workspace_id}")
@@ -241,9 +427,16 @@ Examples:
             success = consolidated_file is not None
             if success:
                 print(f"+ Logs extracted to: {consolidated_file}")
+        elif len(workspace_ids) > 1:
+            # Fan the full pipeline out across workspaces
+            success = run_pipeline_for_workspaces(
+                workspace_ids, args.auth_method, args.external_only,
+                args.export_summary, max_parallel=args.max_parallel, run_ts=run_ts)
         else:
             # Run full pipeline
-            success = run_complete_pipeline(args.workspace_id, args.auth_method, args.external_only, args.export_summary)
+            success = run_complete_pipeline(args.workspace_id, args.auth_method,
+                                            args.external_only, args.export_summary,
+                                            run_ts=run_ts)
         
         if success:
             print("\n*** Operation completed successfully! ***")
@@ -257,8 +450,7 @@ Examples:
         sys.exit(1)
     except Exception as e:
         print(f"\n- Unexpected error: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.debug("Unexpected error", exc_info=True)
         sys.exit(1)
 
 
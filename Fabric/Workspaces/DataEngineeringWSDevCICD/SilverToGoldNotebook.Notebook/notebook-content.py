@@ -22,43 +22,86 @@
 
 # CELL ********************
 
-from datetime import date
-import random
+import numpy as np
+import pandas as pd
 from pyspark.sql import SparkSession
-from pyspark.sql import Row
+from pyspark.sql.types import (StructType, StructField, IntegerType, StringType,
+                               DateType, DoubleType)
+
+spark = SparkSession.builder.getOrCreate()
+# Arrow ships the pandas frames to the JVM as columnar batches instead
+# of pickling Row objects one at a time
+spark.conf.set("spark.sql.execution.arrow.pyspark.enabled", "true")
+# Tiny sample tables: one shuffle partition and bin-packed writes keep
+# each table a single Parquet file instead of a spray of near-empty ones
+spark.conf.set("spark.sql.shuffle.partitions", "1")
+spark.conf.set("spark.databricks.delta.optimizeWrite.enabled", "true")
+
+# Explicit schemas skip reflection-based inference over the sample rows
+customers_schema = StructType([
+    StructField("customer_id", IntegerType(), False),
+    StructField("name", StringType(), False),
+    StructField("email", StringType(), False),
+    StructField("signup_date", DateType(), False),
+    StructField("country", StringType(), False),
+])
+
+orders_schema = StructType([
+    StructField("order_id", IntegerType(), False),
+    StructField("customer_id", IntegerType(), False),
+    StructField("order_date", DateType(), False),
+    StructField("amount", DoubleType(), False),
+    StructField("status", StringType(), False),
+])
+
+# Fixed seed keeps reruns reproducible, so downstream Delta snapshots
+# diff cleanly; batched rng calls generate each column in one C loop
+# instead of one Python call per row
+rng = np.random.default_rng(42)
+n_customers = 10
+n_orders = 20
 
 # Create sample Customers data
-customers = [
-    Row(customer_id=i, 
-        name=f'Customer_{i}', 
-        email=f'customer{i}@example.com',
-        signup_date=date(2023, 1, 1).replace(day=random.randint(1,28), month=random.randint(1,12)),
-        country=random.choice(['USA', 'Canada', 'UK', 'Germany', 'France'])
-    ) for i in range(1, 11)
-]
+customer_ids = np.arange(1, n_customers + 1)
+customers_pdf = pd.DataFrame({
+    'customer_id': customer_ids,
+    'name': [f'Customer_{i}' for i in customer_ids],
+    'email': [f'customer{i}@example.com' for i in customer_ids],
+    'signup_date': pd.Series(
+        pd.Timestamp('2023-01-01') + pd.to_timedelta(rng.integers(0, 365, n_customers), 'D')
+    ).dt.date,
+    'country': rng.choice(['USA', 'Canada', 'UK', 'Germany', 'France'], n_customers),
+})
 
 # Create sample Orders data
-orders = []
-for i in range(1, 21):
-    cust_id = random.randint(1, 10)
-    orders.append(
-        Row(order_id=i,
-            customer_id=cust_id,
-            order_date=date(2024, random.randint(1,12), random.randint(1,28)),
-            amount=round(random.uniform(10.0, 200.0), 2),
-            status=random.choice(['Pending', 'Shipped', 'Delivered', 'Cancelled'])
-        )
-    )
-
-spark = SparkSession.builder.getOrCreate()
-df_customers = spark.createDataFrame(customers)
-df_orders = spark.createDataFrame(orders)
-
-# Save sample customers as Delta table
-df_customers.write.format("delta").mode("overwrite").saveAsTable("Customers")
+orders_pdf = pd.DataFrame({
+    'order_id': np.arange(1, n_orders + 1),
+    'customer_id': rng.integers(1, n_customers + 1, n_orders),
+    'order_date': pd.Series(
+        pd.Timestamp('2024-01-01') + pd.to_timedelta(rng.integers(0, 365, n_orders), 'D')
+    ).dt.date,
+    'amount': rng.uniform(10.0, 200.0, n_orders).round(2),
+    'status': rng.choice(['Pending', 'Shipped', 'Delivered', 'Cancelled'], n_orders),
+})
+
+df_customers = spark.createDataFrame(customers_pdf, schema=customers_schema)
+df_orders = spark.createDataFrame(orders_pdf, schema=orders_schema)
+
+# Each frame is materialized twice (Delta save here, warehouse write in
+# the next cell); caching with an eager count runs the Python->JVM
+# conversion once instead of per action
+df_customers.cache().count()
+df_orders.cache().count()
+
+# Save sample customers as Delta table; coalesce(1) writes one Parquet
+# file per table, so the Delta log stays small and later reads scan a
+# single file
+df_customers.coalesce(1).write.format("delta").mode("overwrite") \
+    .option("overwriteSchema", "true").saveAsTable("Customers")
 
 # Save sample orders as Delta table
-df_orders.write.format("delta").mode("overwrite").saveAsTable("Orders")
+df_orders.coalesce(1).write.format("delta").mode("overwrite") \
+    .option("overwriteSchema", "true").saveAsTable("Orders")
 
 print("Tables saved as Delta tables in the Lakehouse")
 
@@ -73,9 +116,23 @@ print("Tables saved as Delta tables in the Lakehouse")
 
 import com.microsoft.spark.fabric
 from com.microsoft.spark.fabric.Constants import Constants
-
-df_customers.write.mode("overwrite").synapsesql("GoldWarehouse.dbo.Customers")
-df_orders.write.mode("overwrite").synapsesql("GoldWarehouse.dbo.Orders")
+from concurrent.futures import ThreadPoolExecutor
+
+# Spark actions are thread-safe from the driver, and the two warehouse
+# writes are independent, so submitting both at once overlaps their
+# connection setup, auth, and COPY INTO round-trips
+def _write_to_warehouse(df, table):
+    df.write.mode("overwrite").synapsesql(table)
+
+with ThreadPoolExecutor(max_workers=2) as executor:
+    list(executor.map(lambda args: _write_to_warehouse(*args), [
+        (df_customers, "GoldWarehouse.dbo.Customers"),
+        (df_orders, "GoldWarehouse.dbo.Orders"),
+    ]))
+
+# Last consumers of the cached frames; release the executor memory
+df_customers.unpersist()
+df_orders.unpersist()
 
 # METADATA ********************
 